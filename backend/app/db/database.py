@@ -1,22 +1,30 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 from dotenv import load_dotenv
+from app.db.monitoring import command_stats, pool_stats
 
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI")
 DB_NAME = "articulink"
 
-# Configure connection pooling
-client = AsyncIOMotorClient(
-    MONGO_URI,
-    maxPoolSize=100,  # Increase connection pool
-    minPoolSize=10,
-    maxIdleTimeMS=30000,
-    socketTimeoutMS=5000,
-    connectTimeoutMS=5000,
-    serverSelectionTimeoutMS=5000
-)
+if MONGO_URI == "memory":
+    # In-memory stand-in for offline load tests; single process only
+    # (pip install -r requirements-dev.txt)
+    from mongomock_motor import AsyncMongoMockClient
+    client = AsyncMongoMockClient()
+else:
+    # Configure connection pooling
+    client = AsyncIOMotorClient(
+        MONGO_URI,
+        maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", 100)),  # Increase connection pool
+        minPoolSize=int(os.getenv("MONGO_MIN_POOL_SIZE", 10)),
+        maxIdleTimeMS=30000,
+        socketTimeoutMS=5000,
+        connectTimeoutMS=5000,
+        serverSelectionTimeoutMS=5000,
+        event_listeners=[command_stats, pool_stats]
+    )
 db = client[DB_NAME]
 
 async def create_indexes():
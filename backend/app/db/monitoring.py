@@ -0,0 +1,213 @@
+from collections import deque
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, List
+from pymongo import monitoring
+from app.utils.metrics import MONGO_OPERATION_DURATION
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+MONGO_SLOW_MS = float(os.getenv("MONGO_SLOW_MS", 100))
+SLOW_LOG_SIZE = 50
+MAX_PENDING_COMMANDS = 10_000
+
+# Commands whose argument is not a collection name
+_ADMIN_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "buildInfo", "endSessions", "saslStart", "saslContinue"}
+
+
+def _query_shape(command_name: str, command: Dict[str, Any]) -> Any:
+    """Field names (never values) of the query, so slow-op logs are safe to share"""
+    if command_name in ("find", "count", "distinct"):
+        return sorted((command.get("filter") or command.get("query") or {}).keys())
+    if command_name == "findAndModify":
+        return sorted((command.get("query") or {}).keys())
+    if command_name in ("update", "delete"):
+        statements = command.get("updates") or command.get("deletes") or []
+        return [sorted((s.get("q") or {}).keys()) for s in statements[:3]]
+    if command_name == "aggregate":
+        return [next(iter(stage), "?") for stage in command.get("pipeline", [])]
+    return None
+
+
+class MongoMetricsListener(monitoring.CommandListener):
+    """
+    Time every MongoDB command and keep per-operation stats and a slow-operation log
+
+    Every command is observed in the Prometheus histogram. Operations on
+    collections are also aggregated per (collection, operation) for the
+    diagnostics endpoint; those slower than MONGO_SLOW_MS are logged at
+    WARNING with their query shape and kept in a ring buffer.
+    """
+
+    def __init__(self, slow_ms: float = MONGO_SLOW_MS, max_pending: int = MAX_PENDING_COMMANDS):
+        self.slow_ms = slow_ms
+        self.max_pending = max_pending
+        self._lock = Lock()
+        self._pending: Dict[Any, Any] = {}
+        self._stats: Dict[Any, Dict[str, float]] = {}
+        self.slow_ops = deque(maxlen=SLOW_LOG_SIZE)
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = "-"
+        shape = None if event.command_name in _ADMIN_COMMANDS else _query_shape(event.command_name, event.command)
+        with self._lock:
+            # Commands whose completion event never arrives must not pile up
+            if len(self._pending) >= self.max_pending:
+                self._pending.pop(next(iter(self._pending)))
+            self._pending[(event.connection_id, event.request_id)] = (collection, shape)
+
+    def succeeded(self, event):
+        self._record(event, failed=False)
+
+    def failed(self, event):
+        self._record(event, failed=True)
+
+    def _record(self, event, failed: bool):
+        with self._lock:
+            collection, shape = self._pending.pop((event.connection_id, event.request_id), ("-", None))
+        MONGO_OPERATION_DURATION.labels(collection, event.command_name, "failure" if failed else "success").observe(
+            event.duration_micros / 1_000_000
+        )
+        if event.command_name in _ADMIN_COMMANDS:
+            return
+        duration_ms = event.duration_micros / 1000
+
+        with self._lock:
+            stats = self._stats.setdefault((collection, event.command_name), {
+                "count": 0, "failures": 0, "total_ms": 0.0, "max_ms": 0.0, "slow": 0
+            })
+            stats["count"] += 1
+            stats["total_ms"] += duration_ms
+            stats["max_ms"] = max(stats["max_ms"], duration_ms)
+            if failed:
+                stats["failures"] += 1
+            if duration_ms >= self.slow_ms:
+                stats["slow"] += 1
+
+        if duration_ms >= self.slow_ms:
+            entry = {
+                "at": datetime.utcnow().isoformat(),
+                "collection": collection,
+                "operation": event.command_name,
+                "duration_ms": round(duration_ms, 2),
+                "shape": shape,
+                "failed": failed
+            }
+            self.slow_ops.append(entry)
+            logger.warning("Slow MongoDB %s on %s: %.1f ms shape=%s", event.command_name, collection, duration_ms, shape)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Per-operation stats, most total time first"""
+        with self._lock:
+            rows = [
+                {
+                    "collection": collection,
+                    "operation": operation,
+                    "count": int(s["count"]),
+                    "failures": int(s["failures"]),
+                    "slow": int(s["slow"]),
+                    "avg_ms": round(s["total_ms"] / s["count"], 3) if s["count"] else 0.0,
+                    "max_ms": round(s["max_ms"], 3),
+                    "total_ms": round(s["total_ms"], 3)
+                }
+                for (collection, operation), s in self._stats.items()
+            ]
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+        self.slow_ops.clear()
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Track pool size, concurrent checkouts and how long checkouts wait"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.open_connections = getattr(self, "open_connections", 0)
+            self.checked_out = getattr(self, "checked_out", 0)
+            self.peak_checked_out = self.checked_out
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.checkouts = 0
+            self.checkout_wait_total_ms = 0.0
+            self.checkout_wait_max_ms = 0.0
+            self.checkout_failures: Dict[str, int] = {}
+            self.pool_clears = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+            self.open_connections += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+            self.open_connections = max(0, self.open_connections - 1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        wait_ms = getattr(event, "duration", 0) * 1000
+        with self._lock:
+            self.checkout_failures[str(event.reason)] = self.checkout_failures.get(str(event.reason), 0) + 1
+        logger.warning("MongoDB connection checkout failed after %.1f ms: %s", wait_ms, event.reason)
+
+    def connection_checked_out(self, event):
+        # duration (seconds) covers the whole checkout including waiting for a free connection
+        wait_ms = getattr(event, "duration", 0) * 1000
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_wait_total_ms += wait_ms
+            self.checkout_wait_max_ms = max(self.checkout_wait_max_ms, wait_ms)
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "open_connections": self.open_connections,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+                "checkouts": self.checkouts,
+                "checkout_wait_avg_ms": round(self.checkout_wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "checkout_wait_max_ms": round(self.checkout_wait_max_ms, 3),
+                "checkout_failures": dict(self.checkout_failures),
+                "pool_clears": self.pool_clears
+            }
+
+
+command_stats = MongoMetricsListener()
+pool_stats = PoolStatsListener()
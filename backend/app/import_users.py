@@ -0,0 +1,59 @@
+"""
+Bulk user import CLI
+
+Usage:
+    python -m app.import_users users.csv
+    python -m app.import_users users.jsonl --batch-size 500 --errors errors.jsonl
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from dotenv import load_dotenv
+
+from app.db.database import create_indexes
+from app.utils.bulk_import import detect_format, parse_rows, import_users, shutdown_hash_pool, BATCH_SIZE
+
+load_dotenv()
+
+
+async def main(args: argparse.Namespace) -> int:
+    fmt = args.format or detect_format(args.path)
+    with open(args.path, encoding="utf-8-sig") as f:
+        text = f.read()
+
+    # The unique email index is what rejects existing accounts
+    await create_indexes()
+
+    started = time.perf_counter()
+    try:
+        summary = await import_users(parse_rows(text, fmt), batch_size=args.batch_size)
+    finally:
+        shutdown_hash_pool()
+    elapsed = time.perf_counter() - started
+
+    print(f"Imported {summary['inserted']}/{summary['total']} users in {elapsed:.1f}s ({summary['failed']} failed)")
+
+    if args.errors and summary["errors"]:
+        with open(args.errors, "w", encoding="utf-8") as f:
+            for err in summary["errors"]:
+                f.write(json.dumps(err) + "\n")
+        print(f"Row errors written to {args.errors}")
+    else:
+        for err in summary["errors"][:20]:
+            print(f"  row {err['row']} ({err['email']}): {err['error']}")
+        if summary["failed"] > 20:
+            print(f"  ... {summary['failed'] - 20} more")
+
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import ArticuLink users from CSV or JSON Lines")
+    parser.add_argument("path", help="Path to a .csv or .jsonl file")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Override format detection")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows per insert_many batch")
+    parser.add_argument("--errors", help="Write per-row errors to this JSON Lines file")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -1,59 +1,207 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from dotenv import load_dotenv
+from typing import Iterable, List, Optional, Union
+import importlib
 import os
 
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
-
-from app.routes import auth, transcribe, chat
-from app.db.database import create_indexes
+from app.utils.uploads import BodySizeLimitMiddleware, MAX_AUDIO_SIZE, MULTIPART_OVERHEAD
+from app.utils.logging_config import setup_logging, shutdown_logging, RequestIdMiddleware
+from app.utils.metrics import (
+    MetricsMiddleware, render_metrics, METRICS_CONTENT_TYPE,
+    start_event_loop_monitor, stop_event_loop_monitor
+)
 
 load_dotenv()
 
-app = FastAPI(
-    title="ArticuLink",
-)
+# Which routers this process serves: a comma-separated list of groups or
+# router names, e.g. "api" for auth/chat workers, "transcription" for the
+# Whisper pool, or "all". Route modules are imported only when selected, so
+# API-only workers never load torch/transformers.
+API_SERVICES = os.getenv("API_SERVICES", "all")
 
-# Configure Cloudinary
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET")
-)
-# CORS middleware - Add your React Native URLs
-origins = os.getenv("ALLOWED_ORIGINS", "").split(",") + [
-    "http://localhost:19006",
-    "http://192.168.100.11:19006",
-    "exp://192.168.100.11:19000"
-]
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+SERVICE_GROUPS = {
+    "api": ("auth", "chat", "admin"),
+    "transcription": ("transcribe", "voice"),
+    "all": ("auth", "chat", "admin", "transcribe", "voice"),
+}
+ROUTERS = ("auth", "chat", "admin", "transcribe", "voice")
+
+def resolve_routers(services: Union[str, Iterable[str]]) -> List[str]:
+    """Expand service groups / router names into an ordered list of router modules"""
+    names = services.split(",") if isinstance(services, str) else services
+    selected = []
+    for name in (n.strip().lower() for n in names):
+        if not name:
+            continue
+        if name in SERVICE_GROUPS:
+            expanded = SERVICE_GROUPS[name]
+        elif name in ROUTERS:
+            expanded = (name,)
+        else:
+            raise ValueError(f"Unknown service '{name}'. Use one of: {', '.join([*SERVICE_GROUPS, *ROUTERS])}")
+        selected.extend(r for r in expanded if r not in selected)
+    if not selected:
+        raise ValueError("No services selected")
+    return selected
+
+def create_app(services: Optional[Union[str, Iterable[str]]] = None) -> FastAPI:
+    """Build the ArticuLink app serving only the selected routers"""
+    routers = resolve_routers(services or API_SERVICES)
+
+    # Queue-based logging: handlers run on a background thread, not the event loop
+    setup_logging()
+
+    app = FastAPI(
+        title="ArticuLink",
+    )
+    app.state.services = routers
+
+    # CORS middleware - Add your React Native URLs
+    origins = os.getenv("ALLOWED_ORIGINS", "").split(",") + [
+        "http://localhost:19006",
+        "http://192.168.100.11:19006",
+        "exp://192.168.100.11:19000"
+    ]
+
+    # Add CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # GZip compression
+    app.add_middleware(GZipMiddleware, minimum_size=1000)
+
+    # Reject oversized bodies before the multipart parser spools them; routes
+    # not listed here get MAX_REQUEST_BODY_SIZE
+    body_limits = {}
+    if "auth" in routers:
+        from app.utils.cloudinary_helper import MAX_FILE_SIZE
+        body_limits["/api/v1/auth/profile/picture"] = MAX_FILE_SIZE + MULTIPART_OVERHEAD
+    if "transcribe" in routers:
+        # Also covers /api/v1/transcribe/jobs
+        body_limits["/api/v1/transcribe"] = MAX_AUDIO_SIZE + MULTIPART_OVERHEAD
+    if "voice" in routers:
+        body_limits["/api/v1/voice/message"] = MAX_AUDIO_SIZE + MULTIPART_OVERHEAD
+    if "admin" in routers:
+        from app.utils.bulk_import import MAX_IMPORT_BYTES
+        body_limits["/api/v1/admin/users/import"] = MAX_IMPORT_BYTES + MULTIPART_OVERHEAD
+    app.add_middleware(BodySizeLimitMiddleware, limits=body_limits)
+
+    # Request ID for log correlation (returned as X-Request-ID)
+    app.add_middleware(RequestIdMiddleware)
+
+    # Request latency / in-flight metrics (outermost, so it times the whole stack)
+    app.add_middleware(MetricsMiddleware)
+
+    # Include routers
+    for name in routers:
+        module = importlib.import_module(f"app.routes.{name}")
+        app.include_router(module.router)
+
+    if "auth" in routers:
+        _setup_account_services(app)
+    if "admin" in routers:
+        _setup_admin_services(app)
+    if "chat" in routers or "voice" in routers:
+        _setup_chat_services(app)
+    if "transcribe" in routers or "voice" in routers:
+        _setup_transcription_services(app)
+
+    @app.on_event("startup")
+    async def startup_event():
+        from app.db.database import create_indexes
+        await create_indexes()
+        start_event_loop_monitor()
+
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        await stop_event_loop_monitor()
+        shutdown_logging()
+
+    @app.get("/")
+    async def root():
+        return {"message": "ArticuLink API is running!"}
+
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy", "service": "ArticuLink API", "routers": routers}
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+    return app
+
+def _setup_account_services(app: FastAPI) -> None:
+    """Media storage, login throttle and media cleanup used by the auth routes"""
+    from fastapi.staticfiles import StaticFiles
+    from app.utils.rate_limit import create_throttle_indexes
+    from app.utils.media_storage import get_media_storage, shutdown_media_executor, LocalStorage, MEDIA_URL_PREFIX
+    from app.models.media_cleanup import create_media_cleanup_indexes
+    from app.utils.media_cleanup_worker import start_cleanup_worker, stop_cleanup_worker
+
+    # Configure media storage (Cloudinary by default, local files for offline runs)
+    media_storage = get_media_storage()
+    if isinstance(media_storage, LocalStorage):
+        app.mount(MEDIA_URL_PREFIX, StaticFiles(directory=media_storage.root), name="media")
+
+    @app.on_event("startup")
+    async def start_account_services():
+        await create_throttle_indexes()
+        await create_media_cleanup_indexes()
+        start_cleanup_worker()
+
+    @app.on_event("shutdown")
+    async def stop_account_services():
+        await stop_cleanup_worker()
+        shutdown_media_executor()
+
+def _setup_admin_services(app: FastAPI) -> None:
+    """Password-hashing process pool used by the admin bulk import"""
+    from app.utils.bulk_import import shutdown_hash_pool
+
+    @app.on_event("shutdown")
+    async def stop_admin_services():
+        shutdown_hash_pool()
+
+def _setup_chat_services(app: FastAPI) -> None:
+    """Conversation session storage used by the chat and voice routes"""
+    from app.models.chat_session import create_chat_session_indexes
+
+    @app.on_event("startup")
+    async def start_chat_services():
+        await create_chat_session_indexes()
+
+def _setup_transcription_services(app: FastAPI) -> None:
+    """Job queue workers and the Whisper thread pool used by the transcription/voice routes"""
+    from app.models.transcription import create_transcription_job_indexes
+    from app.utils.transcription_worker import start_transcription_workers, stop_transcription_workers
+    from app.utils.whisper import shutdown_whisper_executor
 
-# GZip compression
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+    @app.on_event("startup")
+    async def start_transcription_services():
+        await create_transcription_job_indexes()
+        start_transcription_workers()
 
-# Include routers
-app.include_router(auth.router)
-app.include_router(transcribe.router)
-app.include_router(chat.router)
-@app.on_event("startup")
-async def startup_event():
-    await create_indexes()
+    @app.on_event("shutdown")
+    async def stop_transcription_services():
+        await stop_transcription_workers()
+        shutdown_whisper_executor()
 
-@app.get("/")
-async def root():
-    return {"message": "ArticuLink API is running!"}
+_app: Optional[FastAPI] = None
 
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy", "service": "ArticuLink API"}
\ No newline at end of file
+def __getattr__(name: str):
+    # "app.main:app" builds the default app on first access, so importing this
+    # module (e.g. for create_app with --factory) stays cheap.
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
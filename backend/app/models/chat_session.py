@@ -0,0 +1,90 @@
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+import os
+from bson import ObjectId
+from pymongo import ReturnDocument
+from app.db.database import db
+
+COLLECTION = db.chat_sessions
+
+# Turns kept per session document; older ones are trimmed on write
+CHAT_MAX_STORED_TURNS = int(os.getenv("CHAT_MAX_STORED_TURNS", 200))
+
+async def create_chat_session_indexes():
+    await COLLECTION.create_index([("user_id", 1), ("updated_at", -1)])
+
+def _session_filter(session_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    """Sessions are always looked up together with their owner"""
+    if not ObjectId.is_valid(session_id):
+        return None
+    return {"_id": ObjectId(session_id), "user_id": ObjectId(user_id)}
+
+async def create_chat_session(user_id: str) -> Dict[str, Any]:
+    now = datetime.utcnow()
+    session = {
+        "user_id": ObjectId(user_id),
+        "turns": [],
+        "turn_count": 0,
+        "created_at": now,
+        "updated_at": now
+    }
+    result = await COLLECTION.insert_one(session)
+    session["_id"] = result.inserted_id
+    return session
+
+async def get_chat_session(
+    session_id: str,
+    user_id: str,
+    last_turns: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """Fetch a session, optionally with only its last_turns turns"""
+    query = _session_filter(session_id, user_id)
+    if query is None:
+        return None
+    projection = None
+    if last_turns:
+        projection = {
+            "turns": {"$slice": -last_turns},
+            "turn_count": 1,
+            "created_at": 1,
+            "updated_at": 1
+        }
+    return await COLLECTION.find_one(query, projection)
+
+async def append_chat_turns(
+    session_id: str,
+    user_id: str,
+    turns: List[Dict[str, Any]],
+    expected_count: Optional[int] = None
+) -> Optional[int]:
+    """
+    Append turns and return the new turn_count
+
+    With expected_count the write only applies if nobody else appended since
+    that count was read; None means the session is missing or was changed.
+    """
+    query = _session_filter(session_id, user_id)
+    if query is None:
+        return None
+    if expected_count is not None:
+        query["turn_count"] = expected_count
+
+    now = datetime.utcnow()
+    session = await COLLECTION.find_one_and_update(
+        query,
+        {
+            "$push": {"turns": {"$each": [{**turn, "at": now} for turn in turns], "$slice": -CHAT_MAX_STORED_TURNS}},
+            "$inc": {"turn_count": len(turns)},
+            "$set": {"updated_at": now}
+        },
+        projection={"turn_count": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    return session["turn_count"] if session else None
+
+async def delete_chat_session(session_id: str, user_id: str) -> bool:
+    query = _session_filter(session_id, user_id)
+    if query is None:
+        return False
+    result = await COLLECTION.delete_one(query)
+    return result.deleted_count > 0
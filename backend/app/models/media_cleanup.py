@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+from typing import List, Dict, Any
+import uuid
+from app.db.database import db
+
+COLLECTION = db.media_cleanup
+
+async def create_media_cleanup_indexes():
+    await COLLECTION.create_index([("status", 1), ("next_attempt_at", 1)])
+
+async def enqueue_media_cleanup(public_ids: List[str], reason: str = "replaced"):
+    """Queue storage assets for deletion by the background cleanup worker"""
+    if not public_ids:
+        return
+    now = datetime.utcnow()
+    await COLLECTION.insert_many([
+        {
+            "public_id": public_id,
+            "reason": reason,
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now,
+            "updated_at": now
+        }
+        for public_id in public_ids
+    ])
+
+async def claim_media_cleanup_batch(limit: int, lease_seconds: int) -> List[Dict[str, Any]]:
+    """
+    Lease up to limit due jobs to this worker
+
+    Leased jobs are pushed into the future by lease_seconds, so a worker that
+    dies mid-batch only delays them instead of losing them.
+    """
+    now = datetime.utcnow()
+    due = await COLLECTION.find(
+        {"status": "pending", "next_attempt_at": {"$lte": now}},
+        {"_id": 1}
+    ).sort("next_attempt_at", 1).limit(limit).to_list(length=limit)
+    if not due:
+        return []
+
+    lease_id = uuid.uuid4().hex
+    await COLLECTION.update_many(
+        {"_id": {"$in": [doc["_id"] for doc in due]}, "status": "pending", "next_attempt_at": {"$lte": now}},
+        {"$set": {"lease_id": lease_id, "next_attempt_at": now + timedelta(seconds=lease_seconds)}}
+    )
+    return await COLLECTION.find({"lease_id": lease_id}).to_list(length=limit)
+
+async def complete_media_cleanup(job_ids: List[Any]):
+    if job_ids:
+        await COLLECTION.delete_many({"_id": {"$in": job_ids}})
+
+async def retry_media_cleanup(job: Dict[str, Any], error: str, delay_seconds: float, give_up: bool):
+    """Record a failed attempt; reschedule it, or park it as failed for inspection"""
+    now = datetime.utcnow()
+    await COLLECTION.update_one(
+        {"_id": job["_id"]},
+        {
+            "$set": {
+                "status": "failed" if give_up else "pending",
+                "last_error": error,
+                "next_attempt_at": now + timedelta(seconds=delay_seconds),
+                "updated_at": now
+            },
+            "$inc": {"attempts": 1},
+            "$unset": {"lease_id": ""}
+        }
+    )
+
+async def count_media_cleanup() -> Dict[str, int]:
+    return {
+        "pending": await COLLECTION.count_documents({"status": "pending"}),
+        "failed": await COLLECTION.count_documents({"status": "failed"})
+    }
@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any
+import os
+import uuid
+from bson import ObjectId
+from pymongo import ReturnDocument
+from app.db.database import db
+
+COLLECTION = db.transcription_jobs
+
+# Lower runs first: live clips ahead of bulk practice uploads
+PRIORITIES = {"realtime": 0, "bulk": 1}
+
+# Finished jobs (and their results) are removed this long after completion
+TRANSCRIPTION_RESULT_TTL = int(os.getenv("TRANSCRIPTION_RESULT_TTL", 24 * 60 * 60))
+
+async def create_transcription_job_indexes():
+    await COLLECTION.create_index([("status", 1), ("priority", 1), ("created_at", 1)])
+    await COLLECTION.create_index("expires_at", expireAfterSeconds=0)
+
+async def enqueue_transcription_job(
+    user_id: str,
+    audio_path: str,
+    priority: str = "realtime"
+) -> Dict[str, Any]:
+    now = datetime.utcnow()
+    job = {
+        "user_id": ObjectId(user_id),
+        "audio_path": audio_path,
+        "priority": PRIORITIES[priority],
+        "status": "queued",
+        "attempts": 0,
+        "next_attempt_at": now,
+        "created_at": now,
+        "updated_at": now
+    }
+    result = await COLLECTION.insert_one(job)
+    job["_id"] = result.inserted_id
+    return job
+
+async def get_transcription_job(job_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    if not ObjectId.is_valid(job_id):
+        return None
+    return await COLLECTION.find_one({"_id": ObjectId(job_id), "user_id": ObjectId(user_id)})
+
+async def claim_transcription_job(lease_seconds: int) -> Optional[Dict[str, Any]]:
+    """
+    Lease the most urgent due job to this worker
+
+    A running job's next_attempt_at is its lease expiry, so a job whose
+    worker died is claimed again once the lease runs out.
+    """
+    now = datetime.utcnow()
+    return await COLLECTION.find_one_and_update(
+        {"status": {"$in": ["queued", "running"]}, "next_attempt_at": {"$lte": now}},
+        {
+            "$set": {
+                "status": "running",
+                "lease_id": uuid.uuid4().hex,
+                "next_attempt_at": now + timedelta(seconds=lease_seconds),
+                "started_at": now,
+                "updated_at": now
+            },
+            "$inc": {"attempts": 1}
+        },
+        sort=[("priority", 1), ("created_at", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+async def complete_transcription_job(job: Dict[str, Any], text: str) -> bool:
+    """Store the result; False if the lease was lost to another worker"""
+    now = datetime.utcnow()
+    result = await COLLECTION.update_one(
+        {"_id": job["_id"], "lease_id": job["lease_id"]},
+        {
+            "$set": {
+                "status": "done",
+                "text": text,
+                "finished_at": now,
+                "updated_at": now,
+                "expires_at": now + timedelta(seconds=TRANSCRIPTION_RESULT_TTL)
+            },
+            "$unset": {"lease_id": "", "next_attempt_at": ""}
+        }
+    )
+    return result.modified_count > 0
+
+async def retry_transcription_job(job: Dict[str, Any], error: str, delay_seconds: float, give_up: bool) -> bool:
+    """Record a failed attempt; requeue it, or mark it failed for the client. False if the lease was lost."""
+    now = datetime.utcnow()
+    update = {
+        "$set": {
+            "status": "failed" if give_up else "queued",
+            "last_error": error,
+            "next_attempt_at": now + timedelta(seconds=delay_seconds),
+            "updated_at": now
+        },
+        "$unset": {"lease_id": ""}
+    }
+    if give_up:
+        update["$set"]["finished_at"] = now
+        update["$set"]["expires_at"] = now + timedelta(seconds=TRANSCRIPTION_RESULT_TTL)
+    result = await COLLECTION.update_one({"_id": job["_id"], "lease_id": job["lease_id"]}, update)
+    return result.modified_count > 0
+
+async def count_transcription_jobs() -> Dict[str, int]:
+    counts = {}
+    for status in ("queued", "running", "failed"):
+        counts[status] = await COLLECTION.count_documents({"status": status})
+    return counts
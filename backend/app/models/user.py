@@ -1,12 +1,17 @@
 from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import date, datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
 from app.db.database import db
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Fields never returned from write paths
+USER_PROJECTION = {"password": 0}
+
 # ============================================================================
 # PYDANTIC SCHEMAS
 # ============================================================================
@@ -33,6 +38,7 @@ class UserOut(BaseModel):
     last_name: Optional[str] = None
     role: Optional[str] = None
     profile_pic: Optional[str] = None
+    profile_pic_variants: Optional[Dict[str, str]] = None
     birthdate: Optional[date] = None
     gender: Optional[str] = None
     status: Optional[str] = "active"
@@ -49,6 +55,7 @@ class UserUpdateResponse(BaseModel):
     last_name: Optional[str] = None
     role: Optional[str] = None
     profile_pic: Optional[str] = None
+    profile_pic_variants: Optional[Dict[str, str]] = None
     birthdate: Optional[date] = None
     gender: Optional[str] = None
     status: Optional[str] = "active"
@@ -83,6 +90,70 @@ class UserUpdate(BaseModel):
         from_attributes = True
         extra = "ignore"
 
+# ============================================================================
+# RESPONSE MAPPING
+# ============================================================================
+
+# Stored user documents are trusted, so the auth routes send them pre-serialized:
+# the mapped fields go through model_construct (no validation, no EmailStr check)
+# and pydantic-core dumps the JSON. response_model stays on the routes for OpenAPI.
+_USER_OUT_DEFAULTS = {
+    name: None if field.is_required() else field.default
+    for name, field in UserOut.model_fields.items()
+    if name != "id"
+}
+# Profile update responses have never carried the stored status or timestamps;
+# UserUpdateResponse fills in its defaults for them
+_PROFILE_UPDATE_FIELDS = ("email", "first_name", "last_name", "role", "profile_pic",
+                          "profile_pic_variants", "birthdate", "gender")
+# (field, default) in the order the login payload has always used
+_LOGIN_USER_FIELDS = (("email", None), ("first_name", None), ("last_name", None), ("role", "user"),
+                      ("profile_pic", None), ("profile_pic_variants", None), ("birthdate", None),
+                      ("gender", None), ("status", "active"))
+
+def user_to_response(user: Dict[str, Any], **extra: Any) -> Dict[str, Any]:
+    """Map a user document to the UserOut JSON shape"""
+    data = {"id": str(user["_id"])}
+    for name, default in _USER_OUT_DEFAULTS.items():
+        data[name] = user.get(name, default)
+    data.update(extra)
+    return data
+
+def profile_update_response(user: Dict[str, Any], message: str) -> Dict[str, Any]:
+    """Map an updated user document to the UserUpdateResponse JSON shape"""
+    data = {"id": str(user["_id"])}
+    for name in _PROFILE_UPDATE_FIELDS:
+        data[name] = user.get(name)
+    data["message"] = message
+    return data
+
+def login_user_payload(user: Dict[str, Any]) -> Dict[str, Any]:
+    """User summary embedded in the login Token response"""
+    data = {"_id": str(user["_id"])}
+    for name, default in _LOGIN_USER_FIELDS:
+        data[name] = user.get(name, default)
+    return data
+
+def render_user_out(user: Dict[str, Any], **extra: Any) -> bytes:
+    """UserOut JSON for a stored user document, skipping validation"""
+    # Birthdates are stored as ISO strings; they dump unchanged
+    return UserOut.model_construct(**user_to_response(user, **extra)).model_dump_json(warnings=False).encode()
+
+def render_profile_update(user: Dict[str, Any], message: str) -> bytes:
+    """UserUpdateResponse JSON for an updated user document, skipping validation"""
+    model = UserUpdateResponse.model_construct(**profile_update_response(user, message))
+    return model.model_dump_json(warnings=False).encode()
+
+def render_token(access_token: str, user: Dict[str, Any]) -> bytes:
+    """Token JSON for a successful login, skipping validation"""
+    token = Token.model_construct(
+        access_token=access_token,
+        refresh_token="",  # Empty string since we removed refresh tokens
+        token_type="bearer",
+        user=login_user_payload(user)
+    )
+    return token.model_dump_json(warnings=False).encode()
+
 # ============================================================================
 # USER CRUD OPERATIONS
 # ============================================================================
@@ -96,29 +167,76 @@ async def get_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
     try:
         return await db.users.find_one({"_id": ObjectId(user_id)})
     except Exception as e:
-        logger.error(f"Error getting user by ID {user_id}: {e}")
+        logger.error("Error getting user by ID %s: %s", user_id, e)
         return None
 
 async def create_user(user_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Create a new user account"""
+    """
+    Create a new user account
+
+    Relies on the unique email index for duplicate detection, so callers
+    should handle pymongo.errors.DuplicateKeyError. The returned document
+    is built locally from the inserted data (no re-read).
+    """
+    prepare_user_document(user_data)
+    result = await db.users.insert_one(user_data)
+    user_data["_id"] = result.inserted_id
+    return user_data
+
+def prepare_user_document(user_data: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Normalize a new user document in place (email case, timestamps, defaults)"""
+    now = now or datetime.utcnow()
     user_data.update({
         "email": user_data["email"].lower(),
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow(),
+        "created_at": now,
+        "updated_at": now,
         "status": user_data.get("status", "active"),
         "role": user_data.get("role", "user")
     })
-    result = await db.users.insert_one(user_data)
-    return await db.users.find_one({"_id": result.inserted_id})
+    return user_data
+
+async def create_users_bulk(users: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Insert many user documents with a single unordered insert_many
+
+    Returns the number of inserted documents and a list of
+    {"index": <position in users>, "code": ..., "error": ...} for rejected ones
+    (e.g. duplicate emails), so one bad row never aborts the batch.
+    """
+    if not users:
+        return 0, []
+
+    now = datetime.utcnow()
+    for user_data in users:
+        prepare_user_document(user_data, now)
+
+    try:
+        result = await db.users.insert_many(users, ordered=False)
+        return len(result.inserted_ids), []
+    except BulkWriteError as e:
+        details = e.details or {}
+        errors = [
+            {
+                "index": err.get("index"),
+                "code": err.get("code"),
+                "error": "Email already registered" if err.get("code") == 11000 else err.get("errmsg")
+            }
+            for err in details.get("writeErrors", [])
+        ]
+        return details.get("nInserted", 0), errors
 
 async def update_user(user_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    """Update user profile information"""
+    """Update user profile information and return the updated document"""
     try:
         update_data["updated_at"] = datetime.utcnow()
-        await db.users.update_one({"_id": ObjectId(user_id)}, {"$set": update_data})
-        return await get_user_by_id(user_id)
+        return await db.users.find_one_and_update(
+            {"_id": ObjectId(user_id)},
+            {"$set": update_data},
+            projection=USER_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
     except Exception as e:
-        logger.error(f"Error updating user {user_id}: {e}")
+        logger.error("Error updating user %s: %s", user_id, e)
         return None
 
 async def delete_user(user_id: str) -> bool:
@@ -127,5 +245,5 @@ async def delete_user(user_id: str) -> bool:
         result = await db.users.delete_one({"_id": ObjectId(user_id)})
         return result.deleted_count > 0
     except Exception as e:
-        logger.error(f"Error deleting user {user_id}: {e}")
+        logger.error("Error deleting user %s: %s", user_id, e)
         return False
\ No newline at end of file
@@ -0,0 +1,96 @@
+from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File
+from app.utils.authMiddleware import require_auth, require_admin
+from app.utils.bulk_import import detect_format, parse_rows, import_users, MAX_IMPORT_BYTES, MAX_IMPORT_ROWS
+from app.utils.uploads import read_upload
+from app.utils.rate_limit import login_throttle
+from app.models.media_cleanup import count_media_cleanup
+from app.models.transcription import count_transcription_jobs
+from app.db.database import client
+from app.db.monitoring import command_stats, pool_stats
+from itertools import islice
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/v1/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_auth), Depends(require_admin)]
+)
+
+@router.post("/users/import")
+async def bulk_import_users(file: UploadFile = File(...)):
+    """
+    Bulk-create user accounts from a CSV or JSON Lines file
+
+    Columns/keys follow the register payload (email, password, first_name, ...).
+    Returns counts plus per-row errors; valid rows are inserted even if others fail.
+    """
+    try:
+        fmt = detect_format(file.filename, file.content_type)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    # Streamed with a byte cap; CSV/JSONL have no magic bytes, so the format
+    # comes from detect_format above
+    contents, _ = await read_upload(file, MAX_IMPORT_BYTES, lambda head: fmt, {fmt})
+    try:
+        text = contents.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Import file must be UTF-8 encoded"
+        )
+
+    rows = list(islice(parse_rows(text, fmt), MAX_IMPORT_ROWS + 1))
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Import file exceeds {MAX_IMPORT_ROWS} rows"
+        )
+
+    summary = await import_users(rows)
+    logger.info("Bulk import from %s: %d/%d inserted", file.filename, summary["inserted"], summary["total"])
+    return summary
+
+@router.get("/login-throttle/stats")
+async def login_throttle_stats():
+    """Allowed/rejected login attempt counters for this worker"""
+    return login_throttle.stats()
+
+@router.get("/media-cleanup/stats")
+async def media_cleanup_stats():
+    """Pending and permanently failed media deletions"""
+    return await count_media_cleanup()
+
+@router.get("/transcription-jobs/stats")
+async def transcription_job_stats():
+    """Queued, running and failed transcription jobs"""
+    return await count_transcription_jobs()
+
+@router.get("/diagnostics/mongo")
+async def mongo_diagnostics(reset: bool = False):
+    """
+    Connection pool usage, per-collection/operation latency and recent slow ops
+
+    Stats are per worker process and cover the time since start or last reset.
+    """
+    options = client.delegate.options.pool_options
+    result = {
+        "pool_options": {
+            "max_pool_size": options.max_pool_size,
+            "min_pool_size": options.min_pool_size,
+            "wait_queue_timeout": options.wait_queue_timeout
+        },
+        "pool": pool_stats.snapshot(),
+        "slow_threshold_ms": command_stats.slow_ms,
+        "operations": command_stats.snapshot(),
+        "recent_slow_operations": list(command_stats.slow_ops)
+    }
+    if reset:
+        command_stats.reset()
+        pool_stats.reset()
+    return result
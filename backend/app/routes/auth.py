@@ -1,19 +1,22 @@
-from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File
+from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Request, Response
 from app.models.user import (
     UserCreate, UserOut, Token, LoginRequest, 
     UserUpdate, UserUpdateResponse
 )
 from app.models.user import (
-    get_user_by_email, get_user_by_id, create_user, update_user
+    get_user_by_email, get_user_by_id, create_user, update_user,
+    render_user_out, render_profile_update, render_token
 )
 from app.utils.security import hash_password, verify_password
 from app.utils.tokens import create_access_token
 from app.utils.authMiddleware import require_auth, get_current_user_id
+from app.utils.rate_limit import login_throttle, get_client_ip
 from app.utils.cloudinary_helper import (
     upload_profile_picture, 
-    delete_profile_picture,
-    extract_public_id_from_url
+    get_profile_picture_public_ids
 )
+from app.models.media_cleanup import enqueue_media_cleanup
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
 import logging
 
@@ -21,39 +24,34 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
 
+def json_response(body: bytes, status_code: int = status.HTTP_200_OK) -> Response:
+    """Send pre-serialized JSON as-is, bypassing response_model validation"""
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
 @router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
 async def register(user: UserCreate):
     """Register a new user account"""
-    existing = await get_user_by_email(user.email)
-    if existing:
+    user_dict = user.dict()
+    user_dict["password"] = hash_password(user.password)
+    user_dict = {k: v for k, v in user_dict.items() if v is not None}
+
+    # One round trip: the unique email index rejects duplicates
+    try:
+        result = await create_user(user_dict)
+    except DuplicateKeyError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
-    user_dict = user.dict()
-    user_dict["password"] = hash_password(user.password)
-    user_dict = {k: v for k, v in user_dict.items() if v is not None}
-    
-    result = await create_user(user_dict)
-
-    return UserOut(
-        id=str(result["_id"]),
-        email=result["email"],
-        first_name=result.get("first_name"),
-        last_name=result.get("last_name"),
-        role=result.get("role", "user"),
-        profile_pic=result.get("profile_pic"),
-        birthdate=result.get("birthdate"),
-        gender=result.get("gender"),
-        status=result.get("status", "active"),
-        created_at=result.get("created_at"),
-        updated_at=result.get("updated_at")
-    )
+    return json_response(render_user_out(result), status.HTTP_201_CREATED)
 
 @router.post("/login", response_model=Token)
-async def login(login_data: LoginRequest):
+async def login(login_data: LoginRequest, request: Request):
     """Authenticate user and return access token"""
+    # Throttle before any DB lookup or bcrypt work
+    await login_throttle.check(get_client_ip(request), login_data.email)
+
     user = await get_user_by_email(login_data.email)
     
     invalid_credentials = HTTPException(
@@ -84,7 +82,7 @@ async def login(login_data: LoginRequest):
                     "deactivation_reason": None,
                     "deactivation_end_date": None
                 })
-                logger.info(f"Auto-reactivated user {user['_id']} during login")
+                logger.info("Auto-reactivated user %s during login", user['_id'])
             else:
                 # User is still temporarily deactivated
                 remaining_time = deactivation_end_date - datetime.now()
@@ -103,31 +101,14 @@ async def login(login_data: LoginRequest):
     # Create access token only (no refresh token)
     access_token = create_access_token(str(user["_id"]))
 
-    user_data = {
-        "_id": str(user["_id"]),
-        "email": user["email"],
-        "first_name": user.get("first_name"),
-        "last_name": user.get("last_name"),
-        "role": user.get("role", "user"),
-        "profile_pic": user.get("profile_pic"),
-        "birthdate": user.get("birthdate"),
-        "gender": user.get("gender"),
-        "status": user.get("status", "active")
-    }
-
-    return Token(
-        access_token=access_token,
-        refresh_token="",  # Empty string since we removed refresh tokens
-        token_type="bearer",
-        user=user_data
-    )
+    return json_response(render_token(access_token, user))
 
 @router.post("/logout", dependencies=[Depends(require_auth)])
 async def logout(user_id: str = Depends(get_current_user_id)):
     """
     Logout endpoint (kept for compatibility, no token revocation needed)
     """
-    logger.info(f"User {user_id} logged out")
+    logger.info("User %s logged out", user_id)
     return {"message": "Logged out successfully"}
 
 @router.get("/me", response_model=UserOut, dependencies=[Depends(require_auth)])
@@ -140,19 +121,7 @@ async def get_current_user(user_id: str = Depends(get_current_user_id)):
             detail="User not found"
         )
     
-    return UserOut(
-        id=str(user["_id"]),
-        email=user["email"],
-        first_name=user.get("first_name"),
-        last_name=user.get("last_name"),
-        role=user.get("role"),
-        profile_pic=user.get("profile_pic"),
-        birthdate=user.get("birthdate"),
-        gender=user.get("gender"),
-        status=user.get("status", "active"),  # Make sure status is included
-        created_at=user.get("created_at"),
-        updated_at=user.get("updated_at")
-    )
+    return json_response(render_user_out(user))
 
 @router.put("/profile", response_model=UserUpdateResponse, dependencies=[Depends(require_auth)])
 async def update_profile(
@@ -160,14 +129,7 @@ async def update_profile(
     user_id: str = Depends(get_current_user_id)
 ):
     """Update user profile details (name, birthdate, gender)"""
-    logger.info(f"Update profile request for user: {user_id}")
-    
-    user = await get_user_by_id(user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+    logger.info("Update profile request for user: %s", user_id)
     
     update_data = profile_data.dict(exclude_none=True)
     if not update_data:
@@ -176,26 +138,17 @@ async def update_profile(
             detail="No data provided for update"
         )
     
-    logger.info(f"Updating user {user_id} with data: {update_data}")
+    logger.info("Updating user %s with data: %s", user_id, update_data)
     
+    # find_one_and_update matches nothing when the account is gone
     updated_user = await update_user(user_id, update_data)
     if not updated_user:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to update profile"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
         )
     
-    return UserUpdateResponse(
-        id=str(updated_user["_id"]),
-        email=updated_user["email"],
-        first_name=updated_user.get("first_name"),
-        last_name=updated_user.get("last_name"),
-        role=updated_user.get("role"),
-        profile_pic=updated_user.get("profile_pic"),
-        birthdate=updated_user.get("birthdate"),
-        gender=updated_user.get("gender"),
-        message="Profile updated successfully"
-    )
+    return json_response(render_profile_update(updated_user, message="Profile updated successfully"))
 
 @router.post("/profile/picture", response_model=UserUpdateResponse, dependencies=[Depends(require_auth)])
 async def upload_profile_pic(
@@ -204,8 +157,8 @@ async def upload_profile_pic(
 ):
     """Upload or update profile picture"""
     try:
-        logger.info(f"Received upload request for user: {user_id}")
-        logger.info(f"File info - Name: {file.filename}, Content-Type: {file.content_type}")
+        logger.info("Received upload request for user: %s", user_id)
+        logger.info("File info - Name: %s, Content-Type: %s", file.filename, file.content_type)
         
         user = await get_user_by_id(user_id)
         if not user:
@@ -214,44 +167,41 @@ async def upload_profile_pic(
                 detail="User not found"
             )
         
-        # Extract old public_id for cleanup
-        old_public_id = None
-        if user.get("profile_pic"):
-            old_public_id = extract_public_id_from_url(user["profile_pic"])
-            logger.info(f"Found existing profile pic with public_id: {old_public_id}")
+        # Extract old public_ids (all variants) for cleanup
+        old_public_ids = get_profile_picture_public_ids(user)
+        if old_public_ids:
+            logger.info("Found existing profile pic with public_ids: %s", old_public_ids)
         
-        # Upload to Cloudinary (will replace old image if old_public_id provided)
-        upload_result = await upload_profile_picture(file, user_id, old_public_id)
-        logger.info(f"Upload successful: {upload_result['secure_url']}")
+        # Upload to Cloudinary
+        upload_result = await upload_profile_picture(file, user_id)
+        logger.info("Upload successful: %s", upload_result['secure_url'])
         
-        # Update user with new profile picture URL
-        update_data = {"profile_pic": upload_result["secure_url"]}
+        # Update user with new profile picture URLs
+        update_data = {
+            "profile_pic": upload_result["secure_url"],
+            "profile_pic_variants": upload_result["variants"]
+        }
         updated_user = await update_user(user_id, update_data)
         
         if not updated_user:
+            # The new images are orphaned; let the cleanup worker remove them
+            await enqueue_media_cleanup(upload_result["public_ids"], reason="orphaned")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to update profile picture in database"
             )
         
-        logger.info(f"Database updated successfully for user {user_id}")
+        logger.info("Database updated successfully for user %s", user_id)
         
-        return UserUpdateResponse(
-            id=str(updated_user["_id"]),
-            email=updated_user["email"],
-            first_name=updated_user.get("first_name"),
-            last_name=updated_user.get("last_name"),
-            role=updated_user.get("role"),
-            profile_pic=updated_user.get("profile_pic"),
-            birthdate=updated_user.get("birthdate"),
-            gender=updated_user.get("gender"),
-            message="Profile picture updated successfully"
-        )
+        # Old images are deleted in the background by the media cleanup worker
+        await enqueue_media_cleanup(old_public_ids, reason="replaced")
+        
+        return json_response(render_profile_update(updated_user, message="Profile picture updated successfully"))
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in upload_profile_pic: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in upload_profile_pic: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
@@ -273,14 +223,10 @@ async def delete_profile_pic(user_id: str = Depends(get_current_user_id)):
             detail="No profile picture to delete"
         )
     
-    # Extract public_id from Cloudinary URL
-    old_public_id = extract_public_id_from_url(user["profile_pic"])
-    
-    # Delete from Cloudinary
-    if old_public_id:
-        await delete_profile_picture(old_public_id)
-    
     # Remove profile_pic from user document
-    await update_user(user_id, {"profile_pic": None})
+    await update_user(user_id, {"profile_pic": None, "profile_pic_variants": None})
+    
+    # Queue every stored variant for deletion from Cloudinary
+    await enqueue_media_cleanup(get_profile_picture_public_ids(user), reason="deleted")
     
     return {"message": "Profile picture deleted successfully"}
\ No newline at end of file
@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, status
 from app.utils.gemini import generate_gemini_reply
-from app.models.user_memory import (
-    get_user_memory,
-    create_or_update_memory
+from app.models.chat_session import (
+    get_chat_session,
+    delete_chat_session
+)
+from app.utils.chat_window import chat_window, CHAT_CONTEXT_TURNS
+from app.utils.chat_sessions import (
+    load_user_summary,
+    update_memory_summary,
+    open_session,
+    save_session_turns,
+    MEMORY_SUMMARY_EVERY
 )
 from app.utils.authMiddleware import require_auth, get_current_user_id
 from typing import List, Dict
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/api/v1",
@@ -19,38 +31,84 @@ async def send_message(
     user_id: str = Depends(get_current_user_id)
 ):
     """
-    Stateless chat endpoint with summary memory
-    """
+    Chat endpoint with server-side sessions and summary memory
 
-    messages: List[Dict[str, str]] = payload.get("messages")
+    Send {"message": "...", "session_id": "..."}; omit session_id to start a
+    new session (its id is returned). The legacy {"messages": [...]} body
+    with the full history is still accepted.
+    """
+    if "message" not in payload and payload.get("messages"):
+        return await send_stateless_message(payload["messages"], user_id)
 
-    if not messages:
-        raise HTTPException(status_code=400, detail="Messages required")
+    message = payload.get("message")
+    if not isinstance(message, str) or not message.strip():
+        raise HTTPException(status_code=400, detail="Message required")
 
-    # 1️⃣ Load user memory (summary only)
-    memory = await get_user_memory(user_id)
-    user_summary = memory["summary"] if memory else None
+    (session_id, turn_count, window), user_summary = await asyncio.gather(
+        open_session(user_id, payload.get("session_id")),
+        load_user_summary(user_id)
+    )
 
-    # 2️⃣ Generate Gemini reply
+    user_turn = {"role": "user", "content": message}
     reply = await generate_gemini_reply(
-        messages=messages[-8:],  # limit context
+        messages=window + [user_turn],
         user_summary=user_summary
     )
+    await save_session_turns(
+        user_id, session_id, turn_count, window,
+        [user_turn, {"role": "assistant", "content": reply}],
+        user_summary
+    )
+
+    return {
+        "role": "assistant",
+        "content": reply,
+        "session_id": session_id
+    }
+
+async def send_stateless_message(messages: List[Dict[str, str]], user_id: str):
+    """Legacy flow: the client re-sends its whole history every turn"""
+    user_summary = await load_user_summary(user_id)
 
-    # 3️⃣ Occasionally update memory (optional rule)
-    if len(messages) % 15 == 0:
-        summary_prompt = f"""
-Summarize the user's communication needs, struggles,
-and goals in 2–3 sentences based on this conversation.
-"""
-        summary = await generate_gemini_reply(
-            messages + [{"role": "assistant", "content": summary_prompt}],
-            user_summary
-        )
+    reply = await generate_gemini_reply(
+        messages=messages[-CHAT_CONTEXT_TURNS:],  # limit context
+        user_summary=user_summary
+    )
 
-        await create_or_update_memory(user_id, summary)
+    if len(messages) % MEMORY_SUMMARY_EVERY == 0:
+        await update_memory_summary(user_id, messages, user_summary)
 
     return {
         "role": "assistant",
         "content": reply
     }
+
+@router.get("/sessions/{session_id}")
+async def get_session(
+    session_id: str,
+    user_id: str = Depends(get_current_user_id)
+):
+    """Stored turns of a session, e.g. to restore the chat screen"""
+    session = await get_chat_session(session_id, user_id)
+    if not session:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat session not found")
+    return {
+        "session_id": session_id,
+        "turn_count": session["turn_count"],
+        "turns": [
+            {"role": t["role"], "content": t["content"], "at": t.get("at")}
+            for t in session["turns"]
+        ],
+        "created_at": session["created_at"],
+        "updated_at": session["updated_at"]
+    }
+
+@router.delete("/sessions/{session_id}")
+async def delete_session(
+    session_id: str,
+    user_id: str = Depends(get_current_user_id)
+):
+    if not await delete_chat_session(session_id, user_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat session not found")
+    chat_window.discard(user_id, session_id)
+    return {"message": "Chat session deleted"}
@@ -1,58 +1,108 @@
-from fastapi import APIRouter, UploadFile, File
-import torch
-import librosa
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, Response, status
 import tempfile
+import time
 import os
-from transformers import WhisperProcessor, WhisperForConditionalGeneration
+from app.utils.uploads import save_audio_upload
+from app.utils.whisper import run_transcription
+from app.utils.transcription_worker import wait_for_job
+from app.utils.authMiddleware import require_auth, get_current_user_id
+from app.models.transcription import (
+    enqueue_transcription_job,
+    get_transcription_job,
+    PRIORITIES
+)
 
 router = APIRouter(prefix="/api/v1", tags=["Transcription"])
 
-device = "cuda" if torch.cuda.is_available() else "cpu"
-dtype = torch.float16 if device == "cuda" else torch.float32
-
-processor = WhisperProcessor.from_pretrained("openai/whisper-base")
-model = WhisperForConditionalGeneration.from_pretrained(
-    "openai/whisper-base",
-    torch_dtype=dtype
-).to(device)
-
-model.eval()
-model.config.forced_decoder_ids = None
-model.config.suppress_tokens = []
+# Where queued audio waits for a worker; must be shared by every process
+# serving the transcription group (a shared volume when spread over hosts)
+TRANSCRIPTION_SPOOL_DIR = os.getenv(
+    "TRANSCRIPTION_SPOOL_DIR",
+    os.path.join(tempfile.gettempdir(), "articulink-transcription")
+)
+MAX_POLL_WAIT = 30
 
 @router.post("/transcribe")
 async def transcribe_audio(file: UploadFile = File(...)):
-    # Save temp WAV
-    suffix = os.path.splitext(file.filename)[-1] or ".wav"
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        tmp.write(await file.read())
-        tmp_path = tmp.name
-
-    audio, sr = librosa.load(tmp_path, sr=16000, mono=True)
-    os.remove(tmp_path)
-
-    inputs = processor(
-        audio,
-        sampling_rate=16000,
-        return_tensors="pt"
-    )
-
-    input_features = inputs.input_features.to(device, dtype=dtype)
-
-    with torch.no_grad():
-        predicted_ids = model.generate(
-            input_features,
-            task="transcribe",
-            max_new_tokens=128,        # limits rambling
-            do_sample=False,           # deterministic
-            num_beams=1                # faster than beam search
-        )
-
-    text = processor.batch_decode(
-        predicted_ids,
-        skip_special_tokens=True
-    )[0]
+    audio_path = await save_audio_upload(file)
+    try:
+        text = await run_transcription(audio_path)
+    finally:
+        os.remove(audio_path)
 
     return {
-        "text": text.strip()
+        "text": text
     }
+
+def job_to_response(job) -> dict:
+    response = {
+        "job_id": str(job["_id"]),
+        "status": job["status"],
+        "priority": "realtime" if job["priority"] == PRIORITIES["realtime"] else "bulk",
+        "created_at": job["created_at"]
+    }
+    if job["status"] == "done":
+        response["text"] = job["text"]
+        response["finished_at"] = job["finished_at"]
+    elif job["status"] == "failed":
+        response["error"] = "Transcription failed"
+        response["finished_at"] = job.get("finished_at")
+    return response
+
+@router.post("/transcribe/jobs", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(require_auth)])
+async def submit_transcription_job(
+    response: Response,
+    file: UploadFile = File(...),
+    priority: str = Query("realtime"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Queue audio for transcription and return immediately with a job ID
+
+    priority is "realtime" (live clips, served first) or "bulk" (practice
+    uploads). Poll GET /transcribe/jobs/{job_id} for the result.
+    """
+    if priority not in PRIORITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"priority must be one of: {', '.join(PRIORITIES)}"
+        )
+
+    os.makedirs(TRANSCRIPTION_SPOOL_DIR, exist_ok=True)
+    audio_path = await save_audio_upload(file, TRANSCRIPTION_SPOOL_DIR)
+    try:
+        job = await enqueue_transcription_job(user_id, audio_path, priority)
+    except Exception:
+        os.remove(audio_path)
+        raise
+
+    response.headers["Location"] = f"/api/v1/transcribe/jobs/{job['_id']}"
+    return job_to_response(job)
+
+@router.get("/transcribe/jobs/{job_id}", dependencies=[Depends(require_auth)])
+async def get_transcription_job_status(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=MAX_POLL_WAIT),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Job status and, once done, the transcript
+
+    With wait > 0 the request is held until the job finishes or wait seconds
+    pass (long polling).
+    """
+    job = await get_transcription_job(job_id, user_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transcription job not found")
+
+    # Woken early when a worker in this process finishes the job; jobs
+    # finished by other processes are picked up by the periodic re-read
+    deadline = time.monotonic() + wait
+    while job["status"] in ("queued", "running"):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        await wait_for_job(job_id, min(remaining, 1.0))
+        job = await get_transcription_job(job_id, user_id) or job
+
+    return job_to_response(job)
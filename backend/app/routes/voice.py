@@ -0,0 +1,109 @@
+from fastapi import APIRouter, UploadFile, File, Form, Depends
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Optional
+import asyncio
+import json
+import os
+import logging
+from app.utils.uploads import save_audio_upload
+from app.utils.whisper import run_transcription
+from app.utils.gemini import stream_gemini_reply
+from app.utils.chat_sessions import (
+    load_user_summary,
+    load_session_window,
+    save_session_turns
+)
+from app.models.chat_session import create_chat_session
+from app.utils.authMiddleware import require_auth, get_current_user_id
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/v1",
+    tags=["voice"],
+    dependencies=[Depends(require_auth)]
+)
+
+def sse_event(event: str, data: dict) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + json.dumps(data).encode() + b"\n\n"
+
+async def load_session_context(user_id: str, session_id: Optional[str]):
+    """(turn_count, recent turns) of an existing session, or an empty context"""
+    if session_id:
+        return await load_session_window(user_id, session_id)
+    return 0, []
+
+@router.post("/voice/message")
+async def voice_message(
+    file: UploadFile = File(...),
+    session_id: Optional[str] = Form(None),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Speak-to-reply in one round trip: transcribe the audio, then answer it in the chat session
+
+    Responds with Server-Sent Events: one "transcript" event as soon as
+    Whisper finishes, "reply" events carrying text deltas, then "done" with
+    the full reply (or "error"). Omit session_id to start a new session;
+    its id is in the transcript event. The exchange is stored after the
+    stream ends. An unknown session_id is a 404 before any transcription.
+    """
+    # Checked before any audio work, so a bad session_id costs no Whisper time
+    turn_count, window = await load_session_context(user_id, session_id)
+
+    audio_path = await save_audio_upload(file)
+
+    # Memory loads while Whisper runs
+    summary = asyncio.ensure_future(load_user_summary(user_id))
+    try:
+        text = await run_transcription(audio_path)
+    except BaseException:
+        summary.cancel()
+        await asyncio.gather(summary, return_exceptions=True)
+        raise
+    finally:
+        os.remove(audio_path)
+    user_summary = await summary
+
+    if text and not session_id:
+        session_id = str((await create_chat_session(user_id))["_id"])
+
+    # Filled in once the reply is complete; saved after the response is sent
+    finished = {}
+
+    async def events():
+        yield sse_event("transcript", {"text": text, "session_id": session_id})
+        if not text:
+            yield sse_event("error", {"detail": "No speech detected"})
+            return
+
+        user_turn = {"role": "user", "content": text}
+        pieces = []
+        try:
+            async for piece in stream_gemini_reply(window + [user_turn], user_summary):
+                pieces.append(piece)
+                yield sse_event("reply", {"delta": piece})
+        except Exception as e:
+            logger.error("Voice reply failed for session %s: %s", session_id, e, exc_info=True)
+            yield sse_event("error", {"detail": "Reply generation failed"})
+            return
+
+        reply = "".join(pieces).strip()
+        finished["turns"] = [user_turn, {"role": "assistant", "content": reply}]
+        yield sse_event("done", {"role": "assistant", "content": reply, "session_id": session_id})
+
+    async def save_turns():
+        if "turns" not in finished:
+            return
+        try:
+            await save_session_turns(user_id, session_id, turn_count, window, finished["turns"], user_summary)
+        except Exception as e:
+            logger.error("Saving voice turns failed for session %s: %s", session_id, e, exc_info=True)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(save_turns)
+    )
@@ -4,11 +4,16 @@ import os
 
 load_dotenv()
 
+# API_SERVICES selects the routers each worker serves ("api", "transcription",
+# "all"); run one process group per service to scale them independently, e.g.
+#   API_SERVICES=api PORT=5000 WEB_CONCURRENCY=4 python -m app.run
+#   API_SERVICES=transcription PORT=5001 WEB_CONCURRENCY=1 python -m app.run
+
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
-        port=5000,
+        port=int(os.getenv("PORT", 5000)),
         reload=False,
-        workers=2
-    )
\ No newline at end of file
+        workers=int(os.getenv("WEB_CONCURRENCY", 2))
+    )
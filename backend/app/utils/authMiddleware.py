@@ -25,7 +25,7 @@ class JWTBearer(HTTPBearer):
                         detail="Invalid authentication scheme."
                     )
                 
-                logger.info(f"Verifying token for request: {request.url}")
+                logger.debug("Verifying token for request: %s", request.url)
                 
                 # Verify token
                 payload = tokens.decode_access_token(credentials.credentials)
@@ -43,7 +43,7 @@ class JWTBearer(HTTPBearer):
                 # Verify user exists and is active
                 user = await get_user_by_id(user_id)
                 if not user:
-                    logger.error(f"User {user_id} not found in database")
+                    logger.error("User %s not found in database", user_id)
                     raise HTTPException(
                         status_code=status.HTTP_401_UNAUTHORIZED,
                         detail="User not found"
@@ -65,7 +65,7 @@ class JWTBearer(HTTPBearer):
                                 "deactivation_reason": None,
                                 "deactivation_end_date": None
                             })
-                            logger.info(f"Auto-reactivated user {user_id}")
+                            logger.info("Auto-reactivated user %s", user_id)
                         else:
                             # User is still temporarily deactivated
                             remaining_time = deactivation_end_date - datetime.now()
@@ -83,7 +83,7 @@ class JWTBearer(HTTPBearer):
                         )
                 
                 request.state.user_id = user_id
-                logger.info(f"Authentication successful for user: {user_id}")
+                logger.debug("Authentication successful for user: %s", user_id)
                 return user_id
             else:
                 # No credentials provided
@@ -97,13 +97,13 @@ class JWTBearer(HTTPBearer):
                     )
                 
         except HTTPException as e:
-            logger.error(f"HTTPException in auth: {e.detail}")
+            logger.error("HTTPException in auth: %s", e.detail)
             if self.optional:
                 request.state.user_id = None
                 return None
             raise e
         except Exception as e:
-            logger.error(f"Authentication error: {str(e)}")
+            logger.error("Authentication error: %s", e)
             if self.optional:
                 request.state.user_id = None
                 return None
@@ -125,4 +125,15 @@ def get_current_user_id(request: Request) -> str:
 
 # Optional authentication for endpoints that work with or without auth
 optional_auth = JWTBearer(auto_error=False, optional=True)
-require_auth = JWTBearer()
\ No newline at end of file
+require_auth = JWTBearer()
+
+async def require_admin(user_id: str = Depends(get_current_user_id)) -> str:
+    """Allow only users with the admin role (use after require_auth)"""
+    user = await get_user_by_id(user_id)
+    if not user or user.get("role") != "admin":
+        logger.warning("User %s attempted an admin operation", user_id)
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return user_id
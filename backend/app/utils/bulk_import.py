@@ -0,0 +1,153 @@
+# app/utils/bulk_import.py
+import asyncio
+import csv
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+import logging
+
+from pydantic import ValidationError
+
+from app.models.user import UserCreate, create_users_bulk
+from app.utils.security import hash_password
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_FORMATS = {"csv", "jsonl"}
+BATCH_SIZE = int(os.getenv("BULK_IMPORT_BATCH_SIZE", 1000))
+HASH_WORKERS = int(os.getenv("BULK_IMPORT_HASH_WORKERS", os.cpu_count() or 1))
+# Upload limits for the admin import endpoint (the CLI reads local files)
+MAX_IMPORT_BYTES = int(os.getenv("BULK_IMPORT_MAX_BYTES", 10 * 1024 * 1024))  # 10MB
+MAX_IMPORT_ROWS = int(os.getenv("BULK_IMPORT_MAX_ROWS", 10_000))
+
+# bcrypt is CPU bound and holds the GIL, so hashing runs in worker processes
+_hash_pool: Optional[ProcessPoolExecutor] = None
+
+def get_hash_pool() -> ProcessPoolExecutor:
+    """Lazily create the shared password-hashing process pool"""
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ProcessPoolExecutor(max_workers=HASH_WORKERS)
+    return _hash_pool
+
+def shutdown_hash_pool() -> None:
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=True)
+        _hash_pool = None
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    """Guess the import format from file name or content type"""
+    name = (filename or "").lower()
+    if name.endswith(".csv") or content_type == "text/csv":
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson")) or content_type in ("application/x-ndjson", "application/jsonl"):
+        return "jsonl"
+    raise ValueError(f"Unsupported import format. Allowed formats: {', '.join(sorted(SUPPORTED_FORMATS))}")
+
+def parse_rows(text: str, fmt: str) -> Iterable[Tuple[int, Any]]:
+    """
+    Yield (row_number, raw_row) pairs from CSV or JSON Lines text
+
+    Row numbers are 1-based data rows (the CSV header is not counted).
+    A JSON line that cannot be decoded is yielded as its error message string.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(text))
+        for row_number, row in enumerate(reader, start=1):
+            # Empty CSV cells mean "not provided"
+            yield row_number, {k.strip(): v for k, v in row.items() if k and v not in (None, "")}
+    elif fmt == "jsonl":
+        row_number = 0
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                yield row_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row_number, f"Invalid JSON: {e.msg}"
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+def validate_rows(rows: Iterable[Tuple[int, Any]]) -> Tuple[List[Tuple[int, UserCreate]], List[Dict[str, Any]]]:
+    """Validate raw rows against UserCreate, collecting per-row errors"""
+    valid: List[Tuple[int, UserCreate]] = []
+    errors: List[Dict[str, Any]] = []
+    seen_emails = set()
+
+    for row_number, raw in rows:
+        if not isinstance(raw, dict):
+            errors.append({"row": row_number, "email": None, "error": raw if isinstance(raw, str) else "Row must be an object"})
+            continue
+        try:
+            user = UserCreate(**raw)
+        except ValidationError as e:
+            message = "; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+            errors.append({"row": row_number, "email": raw.get("email"), "error": message})
+            continue
+
+        # Catch in-file duplicates before they cost a bcrypt hash
+        if user.email in seen_emails:
+            errors.append({"row": row_number, "email": user.email, "error": "Duplicate email in import file"})
+            continue
+        seen_emails.add(user.email)
+        valid.append((row_number, user))
+
+    return valid, errors
+
+def to_user_document(user: UserCreate, password_hash: str) -> Dict[str, Any]:
+    """Build the document create_users_bulk expects from a validated row"""
+    user_dict = user.dict()
+    user_dict["password"] = password_hash
+    if user_dict.get("birthdate") is not None:
+        # BSON has no date type; store ISO strings like profile updates do
+        user_dict["birthdate"] = user_dict["birthdate"].isoformat()
+    return {k: v for k, v in user_dict.items() if v is not None}
+
+async def import_users(
+    rows: Iterable[Tuple[int, Any]],
+    batch_size: int = BATCH_SIZE
+) -> Dict[str, Any]:
+    """
+    Validate, hash and insert users in batches
+
+    Passwords for each batch are hashed in parallel on the process pool while
+    the event loop stays free; each batch is written with one unordered
+    insert_many so duplicates only reject their own row.
+
+    Returns a summary with total/inserted/failed counts and per-row errors.
+    """
+    valid, errors = validate_rows(rows)
+    total = len(valid) + len(errors)
+    inserted = 0
+
+    loop = asyncio.get_running_loop()
+    pool = get_hash_pool()
+
+    for start in range(0, len(valid), batch_size):
+        batch = valid[start:start + batch_size]
+        hashes = await asyncio.gather(*(
+            loop.run_in_executor(pool, hash_password, user.password) for _, user in batch
+        ))
+        documents = [to_user_document(user, pw_hash) for (_, user), pw_hash in zip(batch, hashes)]
+
+        batch_inserted, batch_errors = await create_users_bulk(documents)
+        inserted += batch_inserted
+        for err in batch_errors:
+            row_number, user = batch[err["index"]]
+            errors.append({"row": row_number, "email": user.email, "error": err["error"]})
+
+        logger.info("Bulk import batch %d: %d/%d inserted", start // batch_size + 1, batch_inserted, len(batch))
+
+    errors.sort(key=lambda e: e["row"])
+    return {
+        "total": total,
+        "inserted": inserted,
+        "failed": len(errors),
+        "errors": errors
+    }
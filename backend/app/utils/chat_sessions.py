@@ -0,0 +1,77 @@
+# app/utils/chat_sessions.py
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException, status
+from app.utils.gemini import generate_gemini_reply
+from app.utils.chat_window import chat_window, CHAT_CONTEXT_TURNS
+from app.models.user_memory import get_user_memory, create_or_update_memory
+from app.models.chat_session import (
+    create_chat_session,
+    get_chat_session,
+    append_chat_turns
+)
+
+# Refresh the user's memory summary every this many messages
+MEMORY_SUMMARY_EVERY = 15
+
+SUMMARY_PROMPT = """
+Summarize the user's communication needs, struggles,
+and goals in 2–3 sentences based on this conversation.
+"""
+
+Turn = Dict[str, str]
+
+async def load_user_summary(user_id: str) -> Optional[str]:
+    memory = await get_user_memory(user_id)
+    return memory["summary"] if memory else None
+
+async def update_memory_summary(user_id: str, messages: List[Turn], user_summary: Optional[str]):
+    summary = await generate_gemini_reply(
+        messages + [{"role": "assistant", "content": SUMMARY_PROMPT}],
+        user_summary
+    )
+    await create_or_update_memory(user_id, summary)
+
+async def load_session_window(user_id: str, session_id: str) -> Tuple[int, List[Turn]]:
+    """Recent turns for a session, from this worker's cache or Mongo"""
+    cached = chat_window.get(user_id, session_id)
+    if cached is not None:
+        return cached
+
+    session = await get_chat_session(session_id, user_id, last_turns=CHAT_CONTEXT_TURNS)
+    if not session:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat session not found")
+    chat_window.put(user_id, session_id, session["turn_count"], session["turns"])
+    return chat_window.get(user_id, session_id)
+
+async def open_session(user_id: str, session_id: Optional[str]) -> Tuple[str, int, List[Turn]]:
+    """(session_id, turn_count, recent turns) for an existing session, or a new one"""
+    if session_id:
+        turn_count, window = await load_session_window(user_id, str(session_id))
+        return str(session_id), turn_count, window
+    session = await create_chat_session(user_id)
+    return str(session["_id"]), 0, []
+
+async def save_session_turns(
+    user_id: str,
+    session_id: str,
+    turn_count: int,
+    window: List[Turn],
+    new_turns: List[Turn],
+    user_summary: Optional[str]
+) -> int:
+    """Append a user/assistant exchange, keep the window current and refresh memory when due"""
+    new_count = await append_chat_turns(session_id, user_id, new_turns, expected_count=turn_count)
+    if new_count is not None:
+        chat_window.put(user_id, session_id, new_count, window + new_turns)
+    else:
+        # Another worker (or a concurrent request) appended since our window was read
+        chat_window.discard(user_id, session_id)
+        new_count = await append_chat_turns(session_id, user_id, new_turns)
+        if new_count is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat session not found")
+
+    if new_count // MEMORY_SUMMARY_EVERY > turn_count // MEMORY_SUMMARY_EVERY:
+        session = await get_chat_session(session_id, user_id)
+        if session:
+            await update_memory_summary(user_id, session["turns"], user_summary)
+    return new_count
@@ -0,0 +1,50 @@
+# app/utils/chat_window.py
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Recent turns sent to Gemini as conversation context
+CHAT_CONTEXT_TURNS = int(os.getenv("CHAT_CONTEXT_TURNS", 8))
+# Sessions whose window is kept in this process (least recently used evicted)
+CHAT_WINDOW_SESSIONS = int(os.getenv("CHAT_WINDOW_SESSIONS", 10_000))
+
+Turn = Dict[str, str]
+
+
+class ChatWindowCache:
+    """
+    Per-process LRU of the last few turns of each active chat session
+
+    Each entry remembers the session's turn_count when it was cached. Writes
+    to Mongo are conditional on that count, so an entry made stale by another
+    worker is detected on the next append and reloaded.
+    """
+
+    def __init__(self, max_sessions: int = CHAT_WINDOW_SESSIONS, window: int = CHAT_CONTEXT_TURNS):
+        self.max_sessions = max_sessions
+        self.window = window
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[int, List[Turn]]]" = OrderedDict()
+
+    def get(self, user_id: str, session_id: str) -> Optional[Tuple[int, List[Turn]]]:
+        key = (user_id, session_id)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, user_id: str, session_id: str, turn_count: int, turns: List[Turn]) -> None:
+        key = (user_id, session_id)
+        recent = [{"role": t["role"], "content": t["content"]} for t in turns[-self.window:]]
+        self._entries[key] = (turn_count, recent)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_sessions:
+            self._entries.popitem(last=False)
+
+    def discard(self, user_id: str, session_id: str) -> None:
+        self._entries.pop((user_id, session_id), None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+chat_window = ChatWindowCache()
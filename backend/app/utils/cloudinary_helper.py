@@ -1,123 +1,170 @@
 # app/utils/cloudinary_helper.py
-import cloudinary
-import cloudinary.uploader
+import asyncio
+import io
+import os
+import uuid
 from fastapi import UploadFile, HTTPException, status
-from typing import Optional, Dict
+from typing import Dict, Any, List
+from PIL import Image, ImageOps, UnidentifiedImageError
+from app.utils.uploads import read_upload, sniff_image_type, ALLOWED_IMAGE_TYPES
+from app.utils.media_storage import get_media_storage
+from app.models.media_cleanup import enqueue_media_cleanup
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Allowed image types
-ALLOWED_EXTENSIONS = {"jpg", "jpeg", "png", "gif", "webp"}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 
-async def validate_image(file: UploadFile, contents: bytes) -> None:
-    """Validate uploaded image file"""
-    # Check file extension
-    if file.filename:
-        extension = file.filename.split(".")[-1].lower()
-        if extension not in ALLOWED_EXTENSIONS:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid file type. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
+# Square WebP variants generated locally before upload (largest is the canonical profile_pic)
+PROFILE_PIC_SIZES = (64, 128, 500)
+WEBP_QUALITY = int(os.getenv("PROFILE_PIC_WEBP_QUALITY", 80))
+# Refuse to decode images that would expand to more than this many pixels
+MAX_IMAGE_PIXELS = int(os.getenv("PROFILE_PIC_MAX_PIXELS", 40_000_000))
+
+def preprocess_profile_picture(
+    contents: bytes,
+    sizes=PROFILE_PIC_SIZES,
+    max_pixels: int = MAX_IMAGE_PIXELS
+) -> Dict[int, bytes]:
+    """
+    Decode, square-crop, downscale and re-encode an image as WebP variants
+
+    EXIF orientation is applied first; the re-encoded variants carry no
+    metadata. CPU bound, so call it through an executor.
+
+    Returns {size: webp_bytes}.
+    """
+    with Image.open(io.BytesIO(contents)) as img:
+        # Image.open only parses the header, so this runs before any pixel data is decoded
+        if img.width * img.height > max_pixels:
+            raise Image.DecompressionBombError(
+                f"Image has {img.width * img.height} pixels, limit is {max_pixels}"
             )
-    
-    # Check file size using the actual content length
-    if len(contents) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File size exceeds 5MB limit"
-        )
+        # Let the JPEG decoder skip detail we are about to throw away
+        img.draft("RGB", (max(sizes), max(sizes)))
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+
+        variants = {}
+        for size in sorted(sizes, reverse=True):
+            variant = ImageOps.fit(img, (size, size), method=Image.Resampling.LANCZOS)
+            out = io.BytesIO()
+            variant.save(out, format="WEBP", quality=WEBP_QUALITY, method=4)
+            variants[size] = out.getvalue()
+        return variants
 
 async def upload_profile_picture(
     file: UploadFile, 
-    user_id: str,
-    old_public_id: Optional[str] = None
-) -> Dict[str, str]:
+    user_id: str
+) -> Dict[str, Any]:
     """
-    Upload profile picture to Cloudinary
+    Preprocess profile picture locally and upload its variants to media storage
     
     Args:
         file: The uploaded file
         user_id: User ID for organizing uploads
-        old_public_id: Previous image public_id to delete (if exists)
     
     Returns:
-        Dict containing secure_url and public_id
+        Dict containing secure_url and public_id of the largest variant,
+        plus variants ({size: url}) and public_ids of every variant
     """
     try:
-        logger.info(f"Starting upload for user {user_id}, filename: {file.filename}")
-        
-        # Read file content first
-        contents = await file.read()
-        logger.info(f"File read successfully, size: {len(contents)} bytes")
+        logger.info("Starting upload for user %s, filename: %s", user_id, file.filename)
         
-        # Validate image with contents
-        await validate_image(file, contents)
-        logger.info("Image validation passed")
-        
-        # Delete old image if exists
-        if old_public_id:
-            try:
-                cloudinary.uploader.destroy(old_public_id)
-                logger.info(f"Deleted old profile picture: {old_public_id}")
-            except Exception as e:
-                logger.warning(f"Failed to delete old image: {e}")
+        # Stream the upload, stopping at the size limit and checking magic bytes
+        contents, image_type = await read_upload(file, MAX_FILE_SIZE, sniff_image_type, ALLOWED_IMAGE_TYPES)
+        logger.info("File read successfully, type: %s, size: %s bytes", image_type, len(contents))
+
+        loop = asyncio.get_running_loop()
+        try:
+            variants = await loop.run_in_executor(None, preprocess_profile_picture, contents)
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Could not process image: {str(e)}"
+            )
+        logger.info("Preprocessed variants (px: bytes): %s", {size: len(data) for size, data in variants.items()})
         
-        # Upload to Cloudinary
-        logger.info("Uploading to Cloudinary...")
-        upload_result = cloudinary.uploader.upload(
-            contents,
-            folder=f"articuLink/profiles/{user_id}",
-            transformation=[
-                {"width": 500, "height": 500, "crop": "fill", "gravity": "face"},
-                {"quality": "auto:good"},
-                {"fetch_format": "auto"}
-            ],
-            resource_type="image"
-        )
+        # Upload all variants concurrently; a shared random stem keeps URLs unique per upload
+        storage = get_media_storage()
+        logger.info("Uploading to %s storage...", storage.name)
+        stem = uuid.uuid4().hex[:12]
+        results = await asyncio.gather(*(
+            storage.upload(
+                data,
+                folder=f"articuLink/profiles/{user_id}",
+                public_id=f"{stem}_{size}",
+                format="webp"
+            )
+            for size, data in variants.items()
+        ), return_exceptions=True)
+        uploaded = dict(zip(variants.keys(), results))
+
+        failures = [result for result in uploaded.values() if isinstance(result, BaseException)]
+        if failures:
+            # Variants that did upload would be orphaned; hand them to the cleanup worker
+            orphaned = [result["public_id"] for result in uploaded.values() if not isinstance(result, BaseException)]
+            if orphaned:
+                logger.warning("Queueing %s orphaned variants for cleanup: %s", len(orphaned), orphaned)
+                await enqueue_media_cleanup(orphaned, reason="orphaned")
+            raise failures[0]
+        largest = uploaded[max(uploaded)]
         
-        logger.info(f"Successfully uploaded profile picture for user {user_id}")
-        logger.info(f"Cloudinary URL: {upload_result['secure_url']}")
+        logger.info("Successfully uploaded profile picture for user %s", user_id)
+        logger.info("Profile picture URL: %s", largest['secure_url'])
         
         return {
-            "secure_url": upload_result["secure_url"],
-            "public_id": upload_result["public_id"]
+            "secure_url": largest["secure_url"],
+            "public_id": largest["public_id"],
+            "variants": {str(size): result["secure_url"] for size, result in sorted(uploaded.items())},
+            "public_ids": [result["public_id"] for result in uploaded.values()]
         }
         
     except HTTPException as he:
-        logger.error(f"Validation error: {he.detail}")
+        logger.error("Validation error: %s", he.detail)
         raise
+    except asyncio.TimeoutError:
+        logger.error("Media upload timed out for user %s", user_id)
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Image upload timed out"
+        )
     except Exception as e:
-        logger.error(f"Cloudinary upload error: {str(e)}", exc_info=True)
+        logger.error("Media upload error: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to upload image: {str(e)}"
         )
 
-async def delete_profile_picture(public_id: str) -> bool:
-    """Delete profile picture from Cloudinary"""
-    try:
-        result = cloudinary.uploader.destroy(public_id)
-        logger.info(f"Delete result for {public_id}: {result}")
-        return result.get("result") == "ok"
-    except Exception as e:
-        logger.error(f"Failed to delete image: {e}")
-        return False
-
-def extract_public_id_from_url(url: str) -> str | None:
+async def delete_profile_pictures(public_ids: List[str]) -> Dict[str, bool]:
     """
-    Extract Cloudinary public_id from URL
-    Format: https://res.cloudinary.com/{cloud_name}/image/upload/{version}/{public_id}.{format}
+    Delete up to 100 images from media storage in one call
+
+    Returns {public_id: done}; assets that are already gone count as done.
+    Raises on transport errors so callers can retry the whole batch.
     """
+    return await get_media_storage().delete_many(public_ids)
+
+def extract_public_id_from_url(url: str) -> str | None:
+    """Extract the storage public_id from a stored media URL"""
     try:
-        url_parts = url.split("/upload/")
-        if len(url_parts) > 1:
-            path_parts = url_parts[1].split("/", 1)
-            if len(path_parts) > 1:
-                public_id = path_parts[1].rsplit(".", 1)[0]
-                logger.info(f"Extracted public_id: {public_id}")
-                return public_id
+        public_id = get_media_storage().public_id_from_url(url)
+        if public_id:
+            logger.info("Extracted public_id: %s", public_id)
+        return public_id
     except Exception as e:
-        logger.error(f"Failed to extract public_id from URL: {str(e)}")
-    return None
\ No newline at end of file
+        logger.error("Failed to extract public_id from URL: %s", e)
+    return None
+
+def get_profile_picture_public_ids(user: Dict[str, Any]) -> List[str]:
+    """Collect public_ids of a user's stored profile picture and all its variants"""
+    urls = list((user.get("profile_pic_variants") or {}).values())
+    if user.get("profile_pic"):
+        urls.append(user["profile_pic"])
+
+    public_ids = []
+    for url in urls:
+        public_id = extract_public_id_from_url(url)
+        if public_id and public_id not in public_ids:
+            public_ids.append(public_id)
+    return public_ids
@@ -1,12 +1,34 @@
-import google.generativeai as genai
+import asyncio
 import os
-from typing import List, Dict, Optional
+import time
+from typing import AsyncIterator, List, Dict, Optional
+from app.utils.metrics import GEMINI_REQUEST_DURATION, record_gemini_usage
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+GEMINI_MODEL_NAME = "models/gemini-3-flash-preview"
 
-model = genai.GenerativeModel(
-    model_name="models/gemini-3-flash-preview"
-)
+# "gemini" (default) or "stub": canned replies after a fixed delay, for
+# offline load tests and local development without an API key
+GEMINI_BACKEND = os.getenv("GEMINI_BACKEND", "gemini").lower()
+GEMINI_STUB_LATENCY_MS = float(os.getenv("GEMINI_STUB_LATENCY_MS", 800))
+
+GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "max_output_tokens": 700,  # 🚨 prevents cut-off
+}
+
+_model = None
+
+def get_model():
+    """Create the Gemini client on first use (the SDK import alone takes ~1s)"""
+    global _model
+    if _model is None:
+        import google.generativeai as genai
+
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+        _model = genai.GenerativeModel(
+            model_name=GEMINI_MODEL_NAME
+        )
+    return _model
 
 SYSTEM_PROMPT = """
 You are ArticuLink’s AI assistant.
@@ -62,12 +84,71 @@ async def generate_gemini_reply(
 ) -> str:
     prompt = build_prompt(messages, user_summary)
 
-    response = model.generate_content(
-        prompt,
-        generation_config={
-            "temperature": 0.7,
-            "max_output_tokens": 700,  # 🚨 prevents cut-off
-        }
-    )
+    if GEMINI_BACKEND == "stub":
+        return await generate_stub_reply(messages)
+
+    started = time.perf_counter()
+    try:
+        response = get_model().generate_content(
+            prompt,
+            generation_config=GENERATION_CONFIG
+        )
+    except Exception:
+        GEMINI_REQUEST_DURATION.labels("failure").observe(time.perf_counter() - started)
+        raise
+    GEMINI_REQUEST_DURATION.labels("success").observe(time.perf_counter() - started)
+    record_gemini_usage(response)
 
     return response.text.strip()
+
+async def stream_gemini_reply(
+    messages: List[Dict[str, str]],
+    user_summary: Optional[str] = None
+) -> AsyncIterator[str]:
+    """Yield the reply text piece by piece as Gemini generates it"""
+    if GEMINI_BACKEND == "stub":
+        async for piece in stream_stub_reply(messages):
+            yield piece
+        return
+
+    prompt = build_prompt(messages, user_summary)
+    started = time.perf_counter()
+    last_chunk = None
+    try:
+        response = await get_model().generate_content_async(
+            prompt,
+            generation_config=GENERATION_CONFIG,
+            stream=True
+        )
+        async for chunk in response:
+            last_chunk = chunk
+            if chunk.parts:
+                yield chunk.text
+    except Exception:
+        GEMINI_REQUEST_DURATION.labels("failure").observe(time.perf_counter() - started)
+        raise
+    GEMINI_REQUEST_DURATION.labels("success").observe(time.perf_counter() - started)
+    if last_chunk is not None:
+        # Streamed responses report usage on the final chunk
+        record_gemini_usage(last_chunk)
+
+async def generate_stub_reply(messages: List[Dict[str, str]]) -> str:
+    """Deterministic offline stand-in for generate_content"""
+    started = time.perf_counter()
+    await asyncio.sleep(GEMINI_STUB_LATENCY_MS / 1000)
+    GEMINI_REQUEST_DURATION.labels("stub").observe(time.perf_counter() - started)
+    last = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+    return f"(stub) I understood: {last[:200]}"
+
+async def stream_stub_reply(messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+    """Stub reply word by word: first piece after a third of the latency, the rest spread over it"""
+    started = time.perf_counter()
+    last = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+    words = f"(stub) I understood: {last[:200]}".split(" ")
+    delay = GEMINI_STUB_LATENCY_MS / 1000
+    await asyncio.sleep(delay / 3)
+    for i, word in enumerate(words):
+        if i:
+            await asyncio.sleep(delay * 2 / 3 / len(words))
+        yield word if i == 0 else " " + word
+    GEMINI_REQUEST_DURATION.labels("stub").observe(time.perf_counter() - started)
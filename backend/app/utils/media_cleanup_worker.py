@@ -0,0 +1,86 @@
+# app/utils/media_cleanup_worker.py
+import asyncio
+import os
+from typing import Optional
+from app.models.media_cleanup import (
+    claim_media_cleanup_batch,
+    complete_media_cleanup,
+    retry_media_cleanup
+)
+from app.utils.cloudinary_helper import delete_profile_pictures
+import logging
+
+logger = logging.getLogger(__name__)
+
+MEDIA_CLEANUP_INTERVAL = float(os.getenv("MEDIA_CLEANUP_INTERVAL", 30))
+MEDIA_CLEANUP_BATCH_SIZE = min(int(os.getenv("MEDIA_CLEANUP_BATCH_SIZE", 100)), 100)  # Admin API limit
+MEDIA_CLEANUP_MAX_ATTEMPTS = int(os.getenv("MEDIA_CLEANUP_MAX_ATTEMPTS", 8))
+MEDIA_CLEANUP_LEASE_SECONDS = 300
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 6 * 60 * 60
+
+_worker_task: Optional[asyncio.Task] = None
+
+def backoff_seconds(attempts: int) -> float:
+    """Exponential backoff: 30s, 60s, 120s ... capped at 6h"""
+    return min(BACKOFF_BASE_SECONDS * (2 ** attempts), BACKOFF_MAX_SECONDS)
+
+async def drain_once() -> int:
+    """Process one batch of due cleanup jobs; returns how many were claimed"""
+    jobs = await claim_media_cleanup_batch(MEDIA_CLEANUP_BATCH_SIZE, MEDIA_CLEANUP_LEASE_SECONDS)
+    if not jobs:
+        return 0
+
+    public_ids = list({job["public_id"] for job in jobs})
+    try:
+        results = await delete_profile_pictures(public_ids)
+        error = "Storage backend did not confirm deletion"
+    except Exception as e:
+        results = {}
+        error = str(e) or type(e).__name__
+
+    done = [job["_id"] for job in jobs if results.get(job["public_id"])]
+    await complete_media_cleanup(done)
+
+    for job in jobs:
+        if results.get(job["public_id"]):
+            continue
+        attempts = job.get("attempts", 0) + 1
+        give_up = attempts >= MEDIA_CLEANUP_MAX_ATTEMPTS
+        await retry_media_cleanup(job, error, backoff_seconds(attempts), give_up)
+        if give_up:
+            logger.error("Giving up deleting media %s after %d attempts: %s", job["public_id"], attempts, error)
+        else:
+            logger.warning("Media cleanup for %s failed (attempt %d): %s", job["public_id"], attempts, error)
+
+    logger.info("Media cleanup batch: %d/%d deleted", len(done), len(jobs))
+    return len(jobs)
+
+async def run_cleanup_worker():
+    """Drain the cleanup queue forever, sleeping when there is nothing due"""
+    while True:
+        try:
+            claimed = await drain_once()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Media cleanup worker error: %s", e, exc_info=True)
+            claimed = 0
+        # Keep going immediately while full batches are available
+        if claimed < MEDIA_CLEANUP_BATCH_SIZE:
+            await asyncio.sleep(MEDIA_CLEANUP_INTERVAL)
+
+def start_cleanup_worker():
+    global _worker_task
+    if _worker_task is None:
+        _worker_task = asyncio.create_task(run_cleanup_worker())
+
+async def stop_cleanup_worker():
+    global _worker_task
+    if _worker_task is not None:
+        _worker_task.cancel()
+        try:
+            await _worker_task
+        except asyncio.CancelledError:
+            pass
+        _worker_task = None
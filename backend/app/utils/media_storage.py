@@ -0,0 +1,217 @@
+# app/utils/media_storage.py
+import asyncio
+import functools
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+# "cloudinary" (default) or "local" (files served from MEDIA_LOCAL_ROOT under /media)
+MEDIA_STORAGE_BACKEND = os.getenv("MEDIA_STORAGE_BACKEND", "cloudinary").lower()
+MEDIA_LOCAL_ROOT = os.getenv("MEDIA_LOCAL_ROOT", "media")
+MEDIA_PUBLIC_BASE_URL = os.getenv("MEDIA_PUBLIC_BASE_URL", "http://localhost:5000").rstrip("/")
+MEDIA_URL_PREFIX = "/media"
+
+# Storage SDKs and disk writes are blocking; calls run on a dedicated thread
+# pool (the Cloudinary SDK reuses its urllib3 connection pool across threads)
+# so they never block the event loop, and a semaphore caps how many run at once.
+MEDIA_MAX_CONCURRENCY = int(os.getenv("MEDIA_MAX_CONCURRENCY", 8))
+MEDIA_UPLOAD_TIMEOUT = float(os.getenv("MEDIA_UPLOAD_TIMEOUT", 30))
+MEDIA_DELETE_TIMEOUT = float(os.getenv("MEDIA_DELETE_TIMEOUT", 10))
+
+_media_executor: Optional[ThreadPoolExecutor] = None
+_media_semaphore: Optional[asyncio.Semaphore] = None
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _media_executor
+    if _media_executor is None:
+        _media_executor = ThreadPoolExecutor(
+            max_workers=MEDIA_MAX_CONCURRENCY,
+            thread_name_prefix="media"
+        )
+    return _media_executor
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _media_semaphore
+    if _media_semaphore is None:
+        _media_semaphore = asyncio.Semaphore(MEDIA_MAX_CONCURRENCY)
+    return _media_semaphore
+
+async def run_media_call(call: Callable[[], Any], timeout: float) -> Any:
+    """
+    Run a blocking storage call off the event loop
+
+    Raises asyncio.TimeoutError if the call does not finish within timeout.
+    """
+    loop = asyncio.get_running_loop()
+    async with _get_semaphore():
+        return await asyncio.wait_for(
+            loop.run_in_executor(_get_executor(), call),
+            timeout=timeout
+        )
+
+def shutdown_media_executor() -> None:
+    """Stop the storage threads; the next storage call starts a fresh pool"""
+    global _media_executor, _media_semaphore
+    if _media_executor is not None:
+        _media_executor.shutdown(wait=False, cancel_futures=True)
+        _media_executor = None
+    _media_semaphore = None
+
+# ============================================================================
+# BACKENDS
+# ============================================================================
+
+class MediaStorage(ABC):
+    """Interface every media storage backend implements"""
+
+    name = "base"
+
+    @abstractmethod
+    async def upload(self, data: bytes, folder: str, public_id: str, format: str) -> Dict[str, str]:
+        """Store data; returns {"secure_url": ..., "public_id": ...}"""
+
+    @abstractmethod
+    async def delete_many(self, public_ids: List[str]) -> Dict[str, bool]:
+        """Delete up to 100 assets; returns {public_id: done}. Raises on transport errors."""
+
+    @abstractmethod
+    def public_id_from_url(self, url: str) -> Optional[str]:
+        """Storage public_id of a URL this backend produced, or None"""
+
+
+class CloudinaryStorage(MediaStorage):
+    name = "cloudinary"
+
+    def __init__(self):
+        import cloudinary
+        import cloudinary.api
+        import cloudinary.uploader
+
+        cloudinary.config(
+            cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
+            api_key=os.getenv("CLOUDINARY_API_KEY"),
+            api_secret=os.getenv("CLOUDINARY_API_SECRET")
+        )
+        self.api = cloudinary.api
+        self.uploader = cloudinary.uploader
+
+    async def upload(self, data: bytes, folder: str, public_id: str, format: str) -> Dict[str, str]:
+        result = await run_media_call(
+            functools.partial(
+                self.uploader.upload,
+                data,
+                folder=folder,
+                public_id=public_id,
+                format=format,
+                resource_type="image",
+                timeout=MEDIA_UPLOAD_TIMEOUT
+            ),
+            MEDIA_UPLOAD_TIMEOUT
+        )
+        return {"secure_url": result["secure_url"], "public_id": result["public_id"]}
+
+    async def delete_many(self, public_ids: List[str]) -> Dict[str, bool]:
+        # One Admin API call deletes up to 100 assets
+        result = await run_media_call(
+            functools.partial(
+                self.api.delete_resources,
+                public_ids,
+                resource_type="image",
+                timeout=MEDIA_DELETE_TIMEOUT
+            ),
+            MEDIA_DELETE_TIMEOUT
+        )
+        deleted = result.get("deleted", {})
+        return {
+            public_id: deleted.get(public_id) in ("deleted", "not_found")
+            for public_id in public_ids
+        }
+
+    def public_id_from_url(self, url: str) -> Optional[str]:
+        """
+        Extract Cloudinary public_id from URL
+        Format: https://res.cloudinary.com/{cloud_name}/image/upload/{version}/{public_id}.{format}
+        """
+        url_parts = url.split("/upload/")
+        if len(url_parts) > 1:
+            path_parts = url_parts[1].split("/", 1)
+            if len(path_parts) > 1:
+                return path_parts[1].rsplit(".", 1)[0]
+        return None
+
+
+class LocalStorage(MediaStorage):
+    """Stores files under root and serves them as static files from MEDIA_URL_PREFIX"""
+
+    name = "local"
+
+    def __init__(self, root: str = MEDIA_LOCAL_ROOT, base_url: str = MEDIA_PUBLIC_BASE_URL):
+        self.root = Path(root).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.base_url = base_url.rstrip("/")
+
+    def _path(self, public_id: str, format: Optional[str] = None) -> Path:
+        path = (self.root / (f"{public_id}.{format}" if format else public_id)).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f"Invalid public_id: {public_id}")
+        return path
+
+    def _write(self, path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _delete(self, public_ids: List[str]) -> Dict[str, bool]:
+        results = {}
+        for public_id in public_ids:
+            path = self._path(public_id)
+            for match in path.parent.glob(f"{path.name}.*"):
+                match.unlink(missing_ok=True)
+            results[public_id] = True
+        return results
+
+    async def upload(self, data: bytes, folder: str, public_id: str, format: str) -> Dict[str, str]:
+        full_id = f"{folder.strip('/')}/{public_id}"
+        path = self._path(full_id, format)
+        await run_media_call(functools.partial(self._write, path, data), MEDIA_UPLOAD_TIMEOUT)
+        return {
+            "secure_url": f"{self.base_url}{MEDIA_URL_PREFIX}/{full_id}.{format}",
+            "public_id": full_id
+        }
+
+    async def delete_many(self, public_ids: List[str]) -> Dict[str, bool]:
+        return await run_media_call(functools.partial(self._delete, public_ids), MEDIA_DELETE_TIMEOUT)
+
+    def public_id_from_url(self, url: str) -> Optional[str]:
+        marker = f"{MEDIA_URL_PREFIX}/"
+        if marker not in url:
+            return None
+        return url.split(marker, 1)[1].rsplit(".", 1)[0]
+
+
+_BACKENDS = {
+    "cloudinary": CloudinaryStorage,
+    "local": LocalStorage,
+}
+_storage: Optional[MediaStorage] = None
+
+def get_media_storage() -> MediaStorage:
+    """Return the configured storage backend (created on first use)"""
+    global _storage
+    if _storage is None:
+        if MEDIA_STORAGE_BACKEND not in _BACKENDS:
+            raise ValueError(f"Unknown MEDIA_STORAGE_BACKEND: {MEDIA_STORAGE_BACKEND}")
+        _storage = _BACKENDS[MEDIA_STORAGE_BACKEND]()
+        logger.info("Using %s media storage", _storage.name)
+    return _storage
+
+def set_media_storage(storage: MediaStorage) -> None:
+    """Override the storage backend (benchmarks, load tests)"""
+    global _storage
+    _storage = storage
@@ -0,0 +1,178 @@
+# app/utils/metrics.py
+import asyncio
+import os
+import time
+from typing import Optional
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    generate_latest,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# With several uvicorn workers, point this at an empty directory so a scrape
+# of any worker reports the aggregate of all of them.
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+EVENT_LOOP_LAG_INTERVAL = float(os.getenv("EVENT_LOOP_LAG_INTERVAL", 0.5))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+# ============================================================================
+# SERIES
+# ============================================================================
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method"],
+    multiprocess_mode="livesum"
+)
+MONGO_OPERATION_DURATION = Histogram(
+    "mongo_operation_duration_seconds",
+    "MongoDB command latency",
+    ["collection", "operation", "outcome"],
+    buckets=DB_BUCKETS
+)
+GEMINI_REQUEST_DURATION = Histogram(
+    "gemini_request_duration_seconds",
+    "Gemini generate_content latency",
+    ["outcome"],
+    buckets=LATENCY_BUCKETS
+)
+GEMINI_TOKENS = Counter(
+    "gemini_tokens",
+    "Gemini tokens consumed",
+    ["kind"]
+)
+WHISPER_STAGE_DURATION = Histogram(
+    "whisper_stage_duration_seconds",
+    "Whisper transcription time per stage",
+    ["stage"],
+    buckets=LATENCY_BUCKETS
+)
+TRANSCRIPTION_QUEUE_WAIT = Histogram(
+    "transcription_queue_wait_seconds",
+    "Time a transcription job waited in the queue before a worker picked it up",
+    ["priority"],
+    buckets=LATENCY_BUCKETS + (60, 300)
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between when a timer should fire and when the event loop ran it",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+
+# ============================================================================
+# HTTP MIDDLEWARE
+# ============================================================================
+
+class MetricsMiddleware:
+    """
+    Record latency per route template and in-flight requests
+
+    Routes are labelled by their template (/api/v1/auth/me), never the raw
+    path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                method,
+                getattr(route, "path", "unmatched"),
+                str(status_code)
+            ).observe(time.perf_counter() - started)
+            in_progress.dec()
+
+# ============================================================================
+# GEMINI / WHISPER HELPERS
+# ============================================================================
+
+def record_gemini_usage(response) -> None:
+    """Count prompt/completion tokens from a generate_content response"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    GEMINI_TOKENS.labels("prompt").inc(getattr(usage, "prompt_token_count", 0) or 0)
+    GEMINI_TOKENS.labels("completion").inc(getattr(usage, "candidates_token_count", 0) or 0)
+
+def whisper_stage(stage: str):
+    """Context manager timing one Whisper stage (decode, features, generate)"""
+    return WHISPER_STAGE_DURATION.labels(stage).time()
+
+# ============================================================================
+# EVENT LOOP LAG
+# ============================================================================
+
+_lag_task: Optional[asyncio.Task] = None
+
+async def _monitor_event_loop_lag(interval: float):
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - expected))
+
+def start_event_loop_monitor():
+    global _lag_task
+    if _lag_task is None:
+        _lag_task = asyncio.create_task(_monitor_event_loop_lag(EVENT_LOOP_LAG_INTERVAL))
+
+async def stop_event_loop_monitor():
+    global _lag_task
+    if _lag_task is not None:
+        _lag_task.cancel()
+        try:
+            await _lag_task
+        except asyncio.CancelledError:
+            pass
+        _lag_task = None
+
+# ============================================================================
+# EXPOSITION
+# ============================================================================
+
+def render_metrics() -> bytes:
+    """Prometheus text exposition for this process (or all workers in multiprocess mode)"""
+    if PROMETHEUS_MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
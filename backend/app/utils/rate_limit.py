@@ -0,0 +1,216 @@
+# app/utils/rate_limit.py
+import math
+import os
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any, Callable, Dict, Optional, Tuple
+from fastapi import Request, HTTPException, status
+from pymongo import ReturnDocument
+from app.db.database import db
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bucket settings: burst capacity and steady refill in attempts per minute
+LOGIN_IP_BURST = int(os.getenv("LOGIN_IP_BURST", 20))
+LOGIN_IP_PER_MINUTE = float(os.getenv("LOGIN_IP_PER_MINUTE", 10))
+LOGIN_EMAIL_BURST = int(os.getenv("LOGIN_EMAIL_BURST", 5))
+LOGIN_EMAIL_PER_MINUTE = float(os.getenv("LOGIN_EMAIL_PER_MINUTE", 3))
+# Per account from all IPs together; roomier than the (email, IP) bucket so
+# only a distributed attack on one account reaches it
+LOGIN_ACCOUNT_BURST = int(os.getenv("LOGIN_ACCOUNT_BURST", 50))
+LOGIN_ACCOUNT_PER_MINUTE = float(os.getenv("LOGIN_ACCOUNT_PER_MINUTE", 20))
+
+# "memory" (per process) or "mongo" (shared between workers)
+LOGIN_THROTTLE_STORE = os.getenv("LOGIN_THROTTLE_STORE", "memory").lower()
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "false").lower() == "true"
+
+MEMORY_STORE_MAX_KEYS = 100_000
+EVICTION_SCAN = 64
+THROTTLE_COLLECTION = "login_throttle"
+
+
+class MemoryBucketStore:
+    """
+    In-process token buckets keyed by string (not shared across workers)
+
+    Buckets are kept in least-recently-used order. When the store is full,
+    buckets that have refilled under their own capacity/rate are dropped
+    first (they carry no state); otherwise the least recently used bucket
+    is evicted, so a flood of new keys never resets active limits wholesale.
+    """
+
+    def __init__(self, max_keys: int = MEMORY_STORE_MAX_KEYS, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        # key -> (tokens, last_update, capacity, per_second)
+        self._buckets: "OrderedDict[str, Tuple[float, float, int, float]]" = OrderedDict()
+
+    async def take(self, key: str, capacity: int, per_second: float) -> Tuple[bool, float]:
+        """Consume one token; returns (allowed, seconds until next token)"""
+        now = self.clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = float(capacity)
+            if len(self._buckets) >= self.max_keys:
+                self._evict(now)
+        else:
+            tokens, last, _, _ = bucket
+            tokens = min(capacity, tokens + (now - last) * per_second)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+
+        self._buckets[key] = (tokens, now, capacity, per_second)
+        self._buckets.move_to_end(key)
+        return allowed, self._retry_after(tokens, per_second)
+
+    @staticmethod
+    def _is_full(bucket: Tuple[float, float, int, float], now: float) -> bool:
+        tokens, last, capacity, per_second = bucket
+        return per_second > 0 and tokens + (now - last) * per_second >= capacity
+
+    def _evict(self, now: float) -> None:
+        # Oldest entries are the likeliest to have refilled; dropping those
+        # loses nothing. The scan is bounded so a full store stays O(1).
+        refilled = [
+            key for key, bucket in islice(self._buckets.items(), EVICTION_SCAN)
+            if self._is_full(bucket, now)
+        ]
+        for key in refilled:
+            del self._buckets[key]
+        if len(self._buckets) >= self.max_keys:
+            self._buckets.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    @staticmethod
+    def _retry_after(tokens: float, per_second: float) -> float:
+        if tokens >= 1 or per_second <= 0:
+            return 0.0
+        return (1 - tokens) / per_second
+
+
+class MongoBucketStore:
+    """
+    Token buckets shared by all workers, one document per key
+
+    Refill and consumption happen in a single pipeline update so concurrent
+    attempts cannot double-spend; a TTL index on expires_at drops idle buckets.
+    """
+
+    def __init__(self, collection=None):
+        self.collection = collection if collection is not None else db[THROTTLE_COLLECTION]
+
+    async def take(self, key: str, capacity: int, per_second: float) -> Tuple[bool, float]:
+        now = datetime.utcnow()
+        idle_seconds = capacity / per_second if per_second > 0 else 3600
+        refilled = {
+            "$min": [
+                capacity,
+                {"$add": [
+                    {"$ifNull": ["$tokens", capacity]},
+                    {"$multiply": [
+                        {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]},
+                        per_second
+                    ]}
+                ]}
+            ]
+        }
+        doc = await self.collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "updated_at": now}},
+                {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+                {"$set": {
+                    "tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                    "expires_at": now + timedelta(seconds=idle_seconds)
+                }}
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return doc["allowed"], MemoryBucketStore._retry_after(doc["tokens"], per_second)
+
+
+async def create_throttle_indexes():
+    await db[THROTTLE_COLLECTION].create_index("expires_at", expireAfterSeconds=0)
+
+
+class LoginThrottle:
+    """
+    Per-IP, per-(email, IP) and per-account token buckets guarding the login endpoint
+
+    The tight email bucket is scoped to the client IP, so nobody can lock a
+    victim out of their account by spraying bad passwords from one place.
+    The account bucket counts every IP together with a much higher capacity,
+    capping the bcrypt work a botnet can spend on a single account.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or (MongoBucketStore() if LOGIN_THROTTLE_STORE == "mongo" else MemoryBucketStore())
+        self.counters: Counter = Counter()
+
+    async def check(self, ip: Optional[str], email: str) -> None:
+        """Raise 429 as soon as a bucket is empty; each bucket checked consumes a token"""
+        try:
+            if ip:
+                allowed, retry_after = await self.store.take(f"ip:{ip}", LOGIN_IP_BURST, LOGIN_IP_PER_MINUTE / 60)
+                if not allowed:
+                    self._reject("ip", retry_after)
+
+            email = email.lower()
+            allowed, retry_after = await self.store.take(
+                f"email:{email}|{ip or '-'}", LOGIN_EMAIL_BURST, LOGIN_EMAIL_PER_MINUTE / 60
+            )
+            if not allowed:
+                self._reject("email", retry_after)
+
+            allowed, retry_after = await self.store.take(
+                f"account:{email}", LOGIN_ACCOUNT_BURST, LOGIN_ACCOUNT_PER_MINUTE / 60
+            )
+            if not allowed:
+                self._reject("account", retry_after)
+        except HTTPException:
+            raise
+        except Exception as e:
+            # Fail open: a broken throttle store must not lock everyone out
+            self.counters["store_errors"] += 1
+            logger.error("Login throttle store error: %s", e)
+            return
+
+        self.counters["allowed"] += 1
+
+    def _reject(self, scope: str, retry_after: float) -> None:
+        self.counters[f"rejected_{scope}"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts. Please try again later.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "store": type(self.store).__name__,
+            "allowed": self.counters["allowed"],
+            "rejected_ip": self.counters["rejected_ip"],
+            "rejected_email": self.counters["rejected_email"],
+            "rejected_account": self.counters["rejected_account"],
+            "store_errors": self.counters["store_errors"]
+        }
+
+
+def get_client_ip(request: Request) -> Optional[str]:
+    """Client address, honoring X-Forwarded-For only when explicitly trusted"""
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else None
+
+
+login_throttle = LoginThrottle()
@@ -28,7 +28,7 @@ def create_access_token(user_id: str, expires_delta: Optional[timedelta] = None)
     }
     
     token = jwt.encode(to_encode, SECRET_KEY, algorithm="HS256")
-    logger.info(f"Created access token for user {user_id}, expires: {expire}")
+    logger.info("Created access token for user %s, expires: %s", user_id, expire)
     return token
 
 def decode_access_token(token: str) -> dict:
@@ -39,7 +39,7 @@ def decode_access_token(token: str) -> dict:
         ValueError: If token is invalid, expired, or malformed
     """
     try:
-        logger.info(f"Attempting to decode access token: {token[:20]}...")
+        logger.debug("Decoding access token")
         payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
         
         # Verify token type
@@ -57,14 +57,14 @@ def decode_access_token(token: str) -> dict:
         if exp_timestamp:
             exp_datetime = datetime.utcfromtimestamp(exp_timestamp)
             if datetime.utcnow() > exp_datetime:
-                logger.error(f"Token expired at {exp_datetime}")
+                logger.error("Token expired at %s", exp_datetime)
                 raise ValueError("Token expired")
         
-        logger.info(f"Access token decoded successfully for user: {payload.get('sub')}")
+        logger.debug("Access token decoded successfully for user: %s", payload.get('sub'))
         return payload
         
     except JWTError as e:
-        logger.error(f"JWTError decoding access token: {str(e)}")
+        logger.error("JWTError decoding access token: %s", e)
         raise ValueError(f"Invalid token: {str(e)}")
 
 def get_user_id_from_token(token: str) -> Optional[str]:
@@ -73,5 +73,5 @@ def get_user_id_from_token(token: str) -> Optional[str]:
         payload = decode_access_token(token)
         return payload.get("sub")
     except (ValueError, JWTError) as e:
-        logger.error(f"Failed to get user ID from token: {str(e)}")
+        logger.error("Failed to get user ID from token: %s", e)
         return None
\ No newline at end of file
@@ -0,0 +1,128 @@
+# app/utils/transcription_worker.py
+import asyncio
+import os
+from datetime import datetime
+from typing import Dict, List, Set
+from app.models.transcription import (
+    claim_transcription_job,
+    complete_transcription_job,
+    retry_transcription_job
+)
+from app.utils.metrics import TRANSCRIPTION_QUEUE_WAIT
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Jobs processed concurrently by this process (0 = accept jobs, leave them to other workers)
+TRANSCRIPTION_WORKERS = int(os.getenv("TRANSCRIPTION_WORKERS", 1))
+TRANSCRIPTION_POLL_INTERVAL = float(os.getenv("TRANSCRIPTION_POLL_INTERVAL", 1))
+TRANSCRIPTION_MAX_ATTEMPTS = int(os.getenv("TRANSCRIPTION_MAX_ATTEMPTS", 3))
+# Must outlast the slowest transcription, or the job is handed to another worker
+TRANSCRIPTION_LEASE_SECONDS = int(os.getenv("TRANSCRIPTION_LEASE_SECONDS", 600))
+RETRY_DELAY_SECONDS = 10
+
+_worker_tasks: List[asyncio.Task] = []
+_waiters: Dict[str, Set[asyncio.Event]] = {}
+
+# ============================================================================
+# LONG-POLL WAKEUPS
+# ============================================================================
+
+async def wait_for_job(job_id: str, timeout: float) -> None:
+    """Sleep until a worker in this process finishes job_id, or timeout"""
+    event = asyncio.Event()
+    _waiters.setdefault(job_id, set()).add(event)
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        waiters = _waiters.get(job_id)
+        if waiters is not None:
+            waiters.discard(event)
+            if not waiters:
+                del _waiters[job_id]
+
+def _notify_job_finished(job_id: str) -> None:
+    for event in _waiters.get(job_id, ()):
+        event.set()
+
+# ============================================================================
+# WORKERS
+# ============================================================================
+
+def _remove_audio(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+async def process_job(job: Dict) -> None:
+    """Transcribe one claimed job and record the outcome"""
+    from app.utils.whisper import run_transcription
+
+    if job["attempts"] > TRANSCRIPTION_MAX_ATTEMPTS:
+        # Leases kept expiring (e.g. the process died mid-run every time)
+        if await retry_transcription_job(job, "Worker lost the job too many times", 0, give_up=True):
+            _remove_audio(job["audio_path"])
+            _notify_job_finished(str(job["_id"]))
+        return
+
+    priority = "realtime" if job["priority"] == 0 else "bulk"
+    TRANSCRIPTION_QUEUE_WAIT.labels(priority).observe(
+        max(0.0, (datetime.utcnow() - job["created_at"]).total_seconds())
+    )
+
+    try:
+        text = await run_transcription(job["audio_path"])
+    except Exception as e:
+        error = str(e) or type(e).__name__
+        give_up = job["attempts"] >= TRANSCRIPTION_MAX_ATTEMPTS or not os.path.exists(job["audio_path"])
+        if not await retry_transcription_job(job, error, RETRY_DELAY_SECONDS, give_up):
+            # Another worker holds the job now and still needs the audio
+            logger.warning("Transcription job %s failed after its lease expired: %s", job["_id"], error)
+        elif give_up:
+            logger.error("Transcription job %s failed after %d attempts: %s", job["_id"], job["attempts"], error)
+            _remove_audio(job["audio_path"])
+            _notify_job_finished(str(job["_id"]))
+        else:
+            logger.warning("Transcription job %s failed (attempt %d): %s", job["_id"], job["attempts"], error)
+        return
+
+    if await complete_transcription_job(job, text):
+        _remove_audio(job["audio_path"])
+        _notify_job_finished(str(job["_id"]))
+    else:
+        logger.warning("Transcription job %s finished after its lease expired; result discarded", job["_id"])
+
+async def run_transcription_worker(index: int):
+    """Claim and process jobs forever, sleeping while the queue is empty"""
+    while True:
+        try:
+            job = await claim_transcription_job(TRANSCRIPTION_LEASE_SECONDS)
+            if job is None:
+                await asyncio.sleep(TRANSCRIPTION_POLL_INTERVAL)
+                continue
+            logger.info("Worker %d processing transcription job %s (attempt %d)", index, job["_id"], job["attempts"])
+            await process_job(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Transcription worker %d error: %s", index, e, exc_info=True)
+            await asyncio.sleep(TRANSCRIPTION_POLL_INTERVAL)
+
+def start_transcription_workers(count: int = TRANSCRIPTION_WORKERS):
+    if not _worker_tasks:
+        for index in range(count):
+            _worker_tasks.append(asyncio.create_task(run_transcription_worker(index)))
+
+async def stop_transcription_workers():
+    """Cancel the workers; jobs they were running are re-claimed when their lease expires"""
+    for task in _worker_tasks:
+        task.cancel()
+    for task in _worker_tasks:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    _worker_tasks.clear()
@@ -0,0 +1,249 @@
+# app/utils/uploads.py
+import json
+import os
+import tempfile
+from typing import Optional, Callable, Collection, Dict, Tuple, BinaryIO
+from fastapi import UploadFile, HTTPException, status
+import logging
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+# Room for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+MAX_AUDIO_SIZE = int(os.getenv("MAX_AUDIO_SIZE", 25 * 1024 * 1024))  # 25MB
+# Body cap for every route without its own entry in BodySizeLimitMiddleware
+MAX_REQUEST_BODY_SIZE = int(os.getenv("MAX_REQUEST_BODY_SIZE", 1024 * 1024))  # 1MB
+
+# ============================================================================
+# MAGIC BYTE SNIFFING
+# ============================================================================
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Detect image type from leading bytes"""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+def sniff_audio_type(head: bytes) -> Optional[str]:
+    """Detect audio container from leading bytes"""
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[4:8] == b"ftyp":
+        # m4a/mp4/3gp (expo-av records AAC in MPEG-4 containers)
+        return "3gp" if head[8:11] == b"3gp" else "m4a"
+    if head.startswith(b"ID3"):
+        return "mp3"
+    if len(head) > 1 and head[0] == 0xFF:
+        # ADTS (AAC) sync word has layer bits 00; MPEG audio frames do not
+        if head[1] & 0xF6 == 0xF0:
+            return "aac"
+        if head[1] & 0xE0 == 0xE0:
+            return "mp3"
+    if head.startswith(b"OggS"):
+        return "ogg"
+    if head.startswith(b"fLaC"):
+        return "flac"
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        return "webm"
+    if head.startswith(b"#!AMR"):
+        return "amr"
+    return None
+
+ALLOWED_IMAGE_TYPES = {"jpeg", "png", "gif", "webp"}
+ALLOWED_AUDIO_TYPES = {"wav", "m4a", "3gp", "aac", "mp3", "ogg", "flac", "webm", "amr"}
+
+# ============================================================================
+# STREAMING READERS
+# ============================================================================
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        detail=f"File size exceeds {max_bytes // (1024 * 1024)}MB limit"
+    )
+
+async def stream_upload(
+    file: UploadFile,
+    sink: Callable[[bytes], None],
+    max_bytes: int,
+    sniff: Callable[[bytes], Optional[str]],
+    allowed_types: Collection[str],
+    chunk_size: int = CHUNK_SIZE
+) -> Tuple[str, int]:
+    """
+    Copy an upload to sink chunk by chunk, enforcing size and type
+
+    The declared size is checked first, the first chunk is sniffed for magic
+    bytes, and reading stops as soon as max_bytes is exceeded.
+
+    Returns (detected_type, total_bytes).
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(max_bytes)
+
+    detected = None
+    total = 0
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        if detected is None:
+            detected = sniff(chunk)
+            if detected not in allowed_types:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid file type. Allowed types: {', '.join(sorted(allowed_types))}"
+                )
+        total += len(chunk)
+        if total > max_bytes:
+            raise _too_large(max_bytes)
+        sink(chunk)
+
+    if detected is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Uploaded file is empty"
+        )
+    return detected, total
+
+async def read_upload(
+    file: UploadFile,
+    max_bytes: int,
+    sniff: Callable[[bytes], Optional[str]],
+    allowed_types: Collection[str]
+) -> Tuple[bytes, str]:
+    """Read a size-limited upload into memory; returns (contents, detected_type)"""
+    buffer = bytearray()
+    detected, _ = await stream_upload(file, buffer.extend, max_bytes, sniff, allowed_types)
+    return bytes(buffer), detected
+
+async def save_upload(
+    file: UploadFile,
+    dst: BinaryIO,
+    max_bytes: int,
+    sniff: Callable[[bytes], Optional[str]],
+    allowed_types: Collection[str]
+) -> str:
+    """Write a size-limited upload to an open file; returns detected_type"""
+    detected, _ = await stream_upload(file, dst.write, max_bytes, sniff, allowed_types)
+    return detected
+
+async def save_audio_upload(file: UploadFile, directory: Optional[str] = None) -> str:
+    """Stream an audio upload to a file named by its sniffed type; returns the path"""
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as tmp:
+        tmp_path = tmp.name
+        try:
+            audio_type = await save_upload(file, tmp, MAX_AUDIO_SIZE, sniff_audio_type, ALLOWED_AUDIO_TYPES)
+        except Exception:
+            tmp.close()
+            os.remove(tmp_path)
+            raise
+
+    # Decoders pick the demuxer from the extension, so use the sniffed type
+    audio_path = f"{tmp_path}.{audio_type}"
+    os.rename(tmp_path, audio_path)
+    return audio_path
+
+# ============================================================================
+# REQUEST BODY LIMIT MIDDLEWARE
+# ============================================================================
+
+class BodySizeLimitMiddleware:
+    """
+    Reject oversized request bodies before the multipart parser buffers them
+
+    limits maps a path prefix to its maximum body size; the longest matching
+    prefix wins (so /api/v1/transcribe covers /api/v1/transcribe/jobs) and
+    every other path gets default_limit. Requests whose Content-Length is too
+    large get 413 immediately; chunked bodies are counted as they stream in
+    and the response is replaced by 413 once the limit is crossed.
+    """
+
+    def __init__(self, app, limits: Dict[str, int], default_limit: int = MAX_REQUEST_BODY_SIZE):
+        self.app = app
+        self.limits = sorted(
+            ((path.rstrip("/"), limit) for path, limit in limits.items()),
+            key=lambda item: len(item[0]),
+            reverse=True
+        )
+        self.default_limit = default_limit
+
+    def limit_for(self, path: str) -> int:
+        path = path.rstrip("/")
+        for prefix, limit in self.limits:
+            if path == prefix or path.startswith(prefix + "/"):
+                return limit
+        return self.default_limit
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        limit = self.limit_for(scope["path"])
+
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    declared = 0
+                if declared > limit:
+                    logger.warning("Rejected %s: Content-Length %s > %s", scope["path"], declared, limit)
+                    return await self._send_413(send, limit)
+                break
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    # Stop the parser; the error response is swapped for 413 below
+                    raise ValueError("Request body too large")
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if exceeded:
+                if message["type"] == "http.response.start" and not response_started:
+                    response_started = True
+                    await self._send_413(send, limit)
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except ValueError:
+            if not exceeded:
+                raise
+            if not response_started:
+                await self._send_413(send, limit)
+
+    @staticmethod
+    async def _send_413(send, limit: int):
+        body = json.dumps({"detail": f"Request body exceeds {limit // (1024 * 1024)}MB limit"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status.HTTP_413_CONTENT_TOO_LARGE,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close")
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,92 @@
+# app/utils/whisper.py
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import torch
+import librosa
+from transformers import WhisperProcessor, WhisperForConditionalGeneration
+from app.utils.metrics import whisper_stage
+
+# Threads running Whisper; torch releases the GIL, so these run alongside the event loop
+WHISPER_THREADS = int(os.getenv("WHISPER_THREADS", 1))
+
+device = "cuda" if torch.cuda.is_available() else "cpu"
+dtype = torch.float16 if device == "cuda" else torch.float32
+
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "openai/whisper-base")
+# Optional smaller model with the same tokenizer (e.g. "openai/whisper-tiny")
+# for speculative decoding: it drafts tokens and WHISPER_MODEL verifies them,
+# so greedy output is unchanged while decoding takes fewer full-model passes
+WHISPER_DRAFT_MODEL = os.getenv("WHISPER_DRAFT_MODEL", "")
+
+def load_model(name: str) -> WhisperForConditionalGeneration:
+    whisper = WhisperForConditionalGeneration.from_pretrained(
+        name,
+        torch_dtype=dtype
+    ).to(device)
+
+    whisper.eval()
+    whisper.config.forced_decoder_ids = None
+    whisper.config.suppress_tokens = []
+    return whisper
+
+processor = WhisperProcessor.from_pretrained(WHISPER_MODEL)
+model = load_model(WHISPER_MODEL)
+draft_model = load_model(WHISPER_DRAFT_MODEL) if WHISPER_DRAFT_MODEL else None
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+_DEFAULT_DRAFT = object()
+
+def generate_ids(input_features, assistant_model=_DEFAULT_DRAFT):
+    """Greedy decode, assisted by the draft model when one is configured"""
+    if assistant_model is _DEFAULT_DRAFT:
+        assistant_model = draft_model
+    extra = {"assistant_model": assistant_model} if assistant_model is not None else {}
+    with torch.no_grad():
+        return model.generate(
+            input_features,
+            task="transcribe",
+            max_new_tokens=128,        # limits rambling
+            do_sample=False,           # deterministic
+            num_beams=1,               # faster than beam search (and required for assisted decoding)
+            **extra
+        )
+
+def transcribe_file(audio_path: str) -> str:
+    """Decode an audio file and run Whisper on it (blocking)"""
+    with whisper_stage("decode"):
+        audio, sr = librosa.load(audio_path, sr=16000, mono=True)
+
+    with whisper_stage("features"):
+        inputs = processor(
+            audio,
+            sampling_rate=16000,
+            return_tensors="pt"
+        )
+
+        input_features = inputs.input_features.to(device, dtype=dtype)
+
+    with whisper_stage("generate"):
+        predicted_ids = generate_ids(input_features)
+
+    text = processor.batch_decode(
+        predicted_ids,
+        skip_special_tokens=True
+    )[0]
+    return text.strip()
+
+async def run_transcription(audio_path: str) -> str:
+    """Run transcribe_file on the Whisper threads without blocking the event loop"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=WHISPER_THREADS, thread_name_prefix="whisper")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, transcribe_file, audio_path)
+
+def shutdown_whisper_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
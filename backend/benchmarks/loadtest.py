@@ -0,0 +1,294 @@
+"""
+Offline end-to-end load test
+
+Replays realistic user sessions against a running ArticuLink server at
+increasing concurrency and reports per-endpoint throughput, latency
+percentiles and error rates. Each virtual user loops through:
+
+    register -> login -> /me -> chat turns -> profile update
+    -> profile picture upload -> transcription (if served) -> /me
+
+With --start-server it launches its own single-worker server on this box
+using the in-memory MongoDB stand-in, the stub LLM and local media storage.
+Install httpx and mongomock-motor with `pip install -r requirements-dev.txt`.
+Point --base-url at an existing `python -m app.run` deployment to measure
+that instead; login throttling should be relaxed there (LOGIN_IP_BURST /
+LOGIN_EMAIL_BURST / LOGIN_ACCOUNT_BURST), since all traffic comes from one IP.
+
+Usage (from backend/):
+    python -m benchmarks.loadtest --start-server
+    python -m benchmarks.loadtest --start-server --services api --levels 1 10 50 100 --duration 30
+    python -m benchmarks.loadtest --base-url http://localhost:5000 --levels 10 50 200
+"""
+import argparse
+import asyncio
+import io
+import math
+import os
+import random
+import socket
+import struct
+import subprocess
+import sys
+import time
+import uuid
+import wave
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    sys.exit("The load test needs httpx: pip install -r requirements-dev.txt")
+
+CHAT_PROMPTS = [
+    "Hi! How do I use ArticuLink when ordering food?",
+    "People keep asking me to repeat myself on the phone.",
+    "Can you help me practice introducing myself?",
+    "What should I do when I feel nervous speaking in class?",
+    "How does the transcription feature work?",
+]
+
+
+# ============================================================================
+# SAMPLE PAYLOADS
+# ============================================================================
+
+def make_wav(seconds: float = 3.0, rate: int = 16000) -> bytes:
+    """A short voiced-sounding clip (harmonics plus noise) as 16-bit mono WAV"""
+    frames = bytearray()
+    for i in range(int(seconds * rate)):
+        t = i / rate
+        sample = 0.3 * math.sin(2 * math.pi * 180 * t) + 0.15 * math.sin(2 * math.pi * 360 * t)
+        sample += random.uniform(-0.05, 0.05)
+        frames += struct.pack("<h", int(max(-1.0, min(1.0, sample)) * 32767))
+    out = io.BytesIO()
+    with wave.open(out, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(bytes(frames))
+    return out.getvalue()
+
+
+def make_jpeg(width: int = 1200, height: int = 900) -> bytes:
+    from PIL import Image
+
+    img = Image.effect_noise((width, height), 64).convert("RGB")
+    out = io.BytesIO()
+    img.save(out, format="JPEG", quality=85)
+    return out.getvalue()
+
+
+# ============================================================================
+# RECORDING
+# ============================================================================
+
+class Recorder:
+    """Per-endpoint latency and error samples for one concurrency level"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.error_samples: Dict[str, str] = {}
+        self.elapsed = 0.0
+
+    async def call(self, name: str, coro, expect=(200, 201, 202)) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await coro
+        except Exception as e:
+            self.errors[name] += 1
+            self.latencies[name].append(time.perf_counter() - started)
+            self.error_samples.setdefault(name, f"{type(e).__name__}: {e}")
+            return None
+        self.latencies[name].append(time.perf_counter() - started)
+        if response.status_code not in expect:
+            self.errors[name] += 1
+            self.error_samples.setdefault(name, f"{response.status_code}: {response.text[:120]}")
+            return None
+        return response
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+# ============================================================================
+# SESSIONS
+# ============================================================================
+
+async def run_session(client: httpx.AsyncClient, rec: Recorder, samples: dict, chat_turns: int, transcribe: bool):
+    email = f"load-{uuid.uuid4().hex[:16]}@example.com"
+    password = "loadtest-password"
+
+    if not await rec.call("POST /auth/register", client.post("/api/v1/auth/register", json={
+        "email": email, "password": password, "first_name": "Load", "last_name": "Test"
+    })):
+        return
+
+    login = await rec.call("POST /auth/login", client.post("/api/v1/auth/login", json={
+        "email": email, "password": password
+    }))
+    if not login:
+        return
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    await rec.call("GET /auth/me", client.get("/api/v1/auth/me", headers=headers))
+
+    session_id = None
+    for turn in range(chat_turns):
+        body = {"message": random.choice(CHAT_PROMPTS)}
+        if session_id:
+            body["session_id"] = session_id
+        reply = await rec.call("POST /message", client.post("/api/v1/message", headers=headers, json=body))
+        if reply:
+            session_id = reply.json().get("session_id", session_id)
+
+    await rec.call("PUT /auth/profile", client.put("/api/v1/auth/profile", headers=headers, json={
+        "first_name": "Loaded", "gender": "other", "birthdate": "2000-01-01"
+    }))
+
+    await rec.call("POST /auth/profile/picture", client.post(
+        "/api/v1/auth/profile/picture",
+        headers=headers,
+        files={"file": ("avatar.jpg", samples["jpeg"], "image/jpeg")}
+    ))
+
+    if transcribe:
+        await rec.call("POST /transcribe", client.post(
+            "/api/v1/transcribe",
+            headers=headers,
+            files={"file": ("clip.wav", samples["wav"], "audio/wav")}
+        ))
+
+    await rec.call("GET /auth/me", client.get("/api/v1/auth/me", headers=headers))
+
+
+async def run_level(base_url: str, concurrency: int, duration: float, samples: dict, args, transcribe: bool) -> Recorder:
+    rec = Recorder()
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        async def virtual_user():
+            while time.perf_counter() < deadline:
+                await run_session(client, rec, samples, args.chat_turns, transcribe)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(virtual_user() for _ in range(concurrency)))
+        rec.elapsed = time.perf_counter() - started
+    return rec
+
+
+def report(concurrency: int, rec: Recorder) -> float:
+    total = sum(len(v) for v in rec.latencies.values())
+    total_errors = sum(rec.errors.values())
+    print(f"\n=== concurrency {concurrency}: {total} requests in {rec.elapsed:.1f}s "
+          f"({total / rec.elapsed:.1f} req/s, {100 * total_errors / max(total, 1):.1f}% errors) ===")
+    print(f"{'endpoint':<28} {'count':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'err%':>6}")
+    for name in sorted(rec.latencies):
+        values = sorted(rec.latencies[name])
+        print(f"{name:<28} {len(values):>6} {len(values) / rec.elapsed:>7.1f} "
+              f"{percentile(values, 50) * 1000:>8.1f} {percentile(values, 95) * 1000:>8.1f} "
+              f"{percentile(values, 99) * 1000:>8.1f} {values[-1] * 1000:>8.1f} "
+              f"{100 * rec.errors[name] / len(values):>6.1f}")
+    for name, sample in rec.error_samples.items():
+        print(f"  first error on {name}: {sample}")
+    return total / rec.elapsed
+
+
+# ============================================================================
+# LOCAL SERVER
+# ============================================================================
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args) -> Tuple[subprocess.Popen, str]:
+    port = free_port()
+    media_root = os.path.join(os.path.abspath(args.media_root), uuid.uuid4().hex[:8])
+    env = {
+        **os.environ,
+        "API_SERVICES": args.services,
+        "MONGO_URI": args.mongo_uri,
+        "GEMINI_BACKEND": "stub",
+        "GEMINI_STUB_LATENCY_MS": str(args.llm_latency_ms),
+        "MEDIA_STORAGE_BACKEND": "local",
+        "MEDIA_LOCAL_ROOT": media_root,
+        "MEDIA_PUBLIC_BASE_URL": f"http://127.0.0.1:{port}",
+        "SECRET_KEY": os.environ.get("SECRET_KEY", "loadtest-secret"),
+        # Every virtual user comes from 127.0.0.1
+        "LOGIN_IP_BURST": "1000000",
+        "LOGIN_IP_PER_MINUTE": "1000000",
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "1", "--log-level", "warning", "--no-access-log"],
+        env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + args.startup_timeout
+    while time.time() < deadline:
+        if server.poll() is not None:
+            sys.exit(f"Server exited during startup (code {server.returncode})")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return server, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    server.terminate()
+    sys.exit("Server did not become healthy in time")
+
+
+async def main(args):
+    server = None
+    base_url = args.base_url
+    if args.start_server:
+        server, base_url = start_server(args)
+        print(f"Started local server at {base_url} (services={args.services}, mongo={args.mongo_uri})")
+
+    try:
+        health = httpx.get(f"{base_url}/health", timeout=5).json()
+        routers = health.get("routers", ["auth", "chat", "admin", "transcribe"])
+        transcribe = "transcribe" in routers and not args.no_transcribe
+        print(f"Routers: {', '.join(routers)}; transcription {'on' if transcribe else 'off'}")
+
+        samples = {"wav": make_wav(args.clip_seconds), "jpeg": make_jpeg()}
+        best = 0.0
+        for concurrency in args.levels:
+            rec = await run_level(base_url, concurrency, args.duration, samples, args, transcribe)
+            throughput = report(concurrency, rec)
+            if best and throughput < best * 1.05:
+                print(f"  -> throughput no longer growing (best {best:.1f} req/s): saturation at or below {concurrency} users")
+            best = max(best, throughput)
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline end-to-end load test for the ArticuLink API")
+    parser.add_argument("--base-url", default="http://localhost:5000", help="Server to test (ignored with --start-server)")
+    parser.add_argument("--start-server", action="store_true", help="Launch a local single-worker server")
+    parser.add_argument("--services", default="all", help="API_SERVICES for the launched server")
+    parser.add_argument("--mongo-uri", default="memory", help="MONGO_URI for the launched server ('memory' or a local mongodb:// URI)")
+    parser.add_argument("--media-root", default="/tmp/articulink-loadtest-media")
+    parser.add_argument("--llm-latency-ms", type=float, default=800, help="Stub LLM reply delay")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 5, 10, 25, 50], help="Concurrent virtual users per step")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per concurrency level")
+    parser.add_argument("--chat-turns", type=int, default=3)
+    parser.add_argument("--clip-seconds", type=float, default=3.0)
+    parser.add_argument("--no-transcribe", action="store_true", help="Skip the transcription step")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--startup-timeout", type=float, default=120)
+    asyncio.run(main(parser.parse_args()))
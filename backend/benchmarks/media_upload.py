@@ -0,0 +1,84 @@
+"""
+Profile-picture upload throughput benchmark (offline, local storage backend)
+
+Runs the real upload_profile_picture path - streaming read, magic-byte check,
+WebP variant generation and storage writes - against LocalStorage in a temp
+directory, at increasing concurrency.
+
+Usage (from backend/):
+    python -m benchmarks.media_upload
+    python -m benchmarks.media_upload --uploads 200 --concurrency 1 4 16 --width 3000 --height 2000
+"""
+import argparse
+import asyncio
+import io
+import statistics
+import tempfile
+import time
+
+from fastapi import UploadFile
+from PIL import Image
+
+from app.utils.media_storage import LocalStorage, set_media_storage, shutdown_media_executor
+from app.utils.cloudinary_helper import upload_profile_picture
+
+
+def make_sample_jpeg(width: int, height: int) -> bytes:
+    """A photo-like JPEG (gradient plus noise) so the encoder does real work"""
+    gradient = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 48)
+    img = Image.merge("RGB", (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    out = io.BytesIO()
+    img.save(out, format="JPEG", quality=90)
+    return out.getvalue()
+
+
+async def run_level(sample: bytes, uploads: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            file = UploadFile(file=io.BytesIO(sample), filename=f"bench_{i}.jpg", size=len(sample))
+            started = time.perf_counter()
+            await upload_profile_picture(file, f"bench{concurrency}")
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(uploads)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "throughput": uploads / elapsed,
+        "mb_per_s": uploads * len(sample) / elapsed / (1024 * 1024),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+async def main(args: argparse.Namespace):
+    sample = make_sample_jpeg(args.width, args.height)
+    print(f"Sample image: {args.width}x{args.height} JPEG, {len(sample) / 1024:.0f} KiB")
+
+    with tempfile.TemporaryDirectory(prefix="articulink-media-") as root:
+        set_media_storage(LocalStorage(root=root, base_url="http://bench.local"))
+        # Warm up decoders and the thread pools
+        await run_level(sample, 2, 1)
+
+        print(f"{'conc':>5} {'uploads/s':>10} {'MiB/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        for concurrency in args.concurrency:
+            r = await run_level(sample, args.uploads, concurrency)
+            print(f"{r['concurrency']:>5} {r['throughput']:>10.1f} {r['mb_per_s']:>8.2f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f}")
+
+    shutdown_media_executor()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark profile-picture uploads against local storage")
+    parser.add_argument("--uploads", type=int, default=50, help="Uploads per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--width", type=int, default=2400)
+    parser.add_argument("--height", type=int, default=1800)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,182 @@
+"""
+Response serialization benchmark for /me, /login and /profile
+
+Sends requests through a FastAPI app's full ASGI path (routing, endpoint,
+response handling) and compares, per route, the previous handler body (build
+the Pydantic model field by field and let FastAPI validate and encode it
+against response_model) with the current one (render the stored document to
+JSON with render_user_out / render_token / render_profile_update and send it
+via json_response). Both variants declare the same response_model and status
+code; database, auth and network are left out so only the response path
+differs. Results depend on the FastAPI and Pydantic versions, which are
+printed first.
+
+Usage (from backend/):
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --number 20000
+"""
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from bson import ObjectId
+import fastapi
+import pydantic
+from fastapi import FastAPI, status
+
+from app.models.user import (
+    UserOut, UserUpdateResponse, Token,
+    render_user_out, render_profile_update, render_token
+)
+from app.routes.auth import json_response
+
+USER_DOC = {
+    "_id": ObjectId(),
+    "email": "bench.user@example.com",
+    "password": "$2b$12$" + "x" * 53,
+    "first_name": "Bench",
+    "last_name": "User",
+    "role": "user",
+    "profile_pic": "https://res.cloudinary.com/demo/image/upload/v1/articuLink/profiles/u/abc_500.webp",
+    "profile_pic_variants": {
+        "64": "https://res.cloudinary.com/demo/image/upload/v1/articuLink/profiles/u/abc_64.webp",
+        "128": "https://res.cloudinary.com/demo/image/upload/v1/articuLink/profiles/u/abc_128.webp",
+        "500": "https://res.cloudinary.com/demo/image/upload/v1/articuLink/profiles/u/abc_500.webp",
+    },
+    "birthdate": "1999-04-12",
+    "gender": "female",
+    "status": "active",
+    "created_at": datetime(2025, 1, 2, 3, 4, 5, 678000),
+    "updated_at": datetime(2025, 6, 7, 8, 9, 10, 111000),
+}
+ACCESS_TOKEN = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9." + "x" * 120
+
+
+def legacy_me(user):
+    return UserOut(
+        id=str(user["_id"]),
+        email=user["email"],
+        first_name=user.get("first_name"),
+        last_name=user.get("last_name"),
+        role=user.get("role"),
+        profile_pic=user.get("profile_pic"),
+        profile_pic_variants=user.get("profile_pic_variants"),
+        birthdate=user.get("birthdate"),
+        gender=user.get("gender"),
+        status=user.get("status", "active"),
+        created_at=user.get("created_at"),
+        updated_at=user.get("updated_at")
+    )
+
+
+def legacy_login(user):
+    user_data = {
+        "_id": str(user["_id"]),
+        "email": user["email"],
+        "first_name": user.get("first_name"),
+        "last_name": user.get("last_name"),
+        "role": user.get("role", "user"),
+        "profile_pic": user.get("profile_pic"),
+        "profile_pic_variants": user.get("profile_pic_variants"),
+        "birthdate": user.get("birthdate"),
+        "gender": user.get("gender"),
+        "status": user.get("status", "active")
+    }
+    return Token(access_token=ACCESS_TOKEN, refresh_token="", token_type="bearer", user=user_data)
+
+
+def legacy_profile(user):
+    return UserUpdateResponse(
+        id=str(user["_id"]),
+        email=user["email"],
+        first_name=user.get("first_name"),
+        last_name=user.get("last_name"),
+        role=user.get("role"),
+        profile_pic=user.get("profile_pic"),
+        profile_pic_variants=user.get("profile_pic_variants"),
+        birthdate=user.get("birthdate"),
+        gender=user.get("gender"),
+        message="Profile updated successfully"
+    )
+
+
+ROUTES = {
+    # path: (method, response_model, status code, legacy handler, current handler)
+    "/me": ("GET", UserOut, status.HTTP_200_OK,
+            lambda: legacy_me(USER_DOC),
+            lambda: json_response(render_user_out(USER_DOC))),
+    "/login": ("POST", Token, status.HTTP_200_OK,
+               lambda: legacy_login(USER_DOC),
+               lambda: json_response(render_token(ACCESS_TOKEN, USER_DOC))),
+    "/profile": ("PUT", UserUpdateResponse, status.HTTP_200_OK,
+                 lambda: legacy_profile(USER_DOC),
+                 lambda: json_response(render_profile_update(USER_DOC, message="Profile updated successfully"))),
+}
+
+
+def build_app() -> FastAPI:
+    """Legacy handlers under /legacy<path>, current ones under /current<path>"""
+    app = FastAPI()
+    for path, (method, model, status_code, legacy, current) in ROUTES.items():
+        for prefix, build in (("/legacy", legacy), ("/current", current)):
+            async def endpoint(build=build):
+                return build()
+            app.add_api_route(prefix + path, endpoint, methods=[method],
+                              response_model=model, status_code=status_code)
+    return app
+
+
+async def call(app: FastAPI, method: str, path: str) -> bytes:
+    """One request through the ASGI interface; returns the response body"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": [],
+        "client": ("127.0.0.1", 50000), "server": ("127.0.0.1", 80),
+    }
+    chunks = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(chunks)
+
+
+async def per_request_us(app: FastAPI, method: str, path: str, number: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            await call(app, method, path)
+        best = min(best, time.perf_counter() - started)
+    return best / number * 1e6
+
+
+async def main(args: argparse.Namespace):
+    app = build_app()
+
+    print(f"fastapi {fastapi.__version__}, pydantic {pydantic.VERSION}")
+    print(f"{'route':<10} {'legacy us':>10} {'current us':>11} {'speedup':>8}")
+    for path, (method, *_rest) in ROUTES.items():
+        legacy_body = await call(app, method, "/legacy" + path)
+        current_body = await call(app, method, "/current" + path)
+        assert legacy_body == current_body, f"{path} responses differ"
+        legacy_us = await per_request_us(app, method, "/legacy" + path, args.number, args.repeat)
+        current_us = await per_request_us(app, method, "/current" + path, args.number, args.repeat)
+        print(f"{path:<10} {legacy_us:>10.2f} {current_us:>11.2f} {legacy_us / current_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark API response serialization")
+    parser.add_argument("--number", type=int, default=5000, help="Requests per timing run")
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,105 @@
+"""
+Whisper speculative decoding benchmark
+
+Times model.generate for plain greedy decoding and for assisted decoding with
+a draft model on a directory of local clips, and checks that both produce the
+same tokens. Audio decoding and feature extraction are done once per clip and
+excluded from the timings.
+
+Needs the transcription dependencies (torch, transformers, librosa) and the
+models in the Hugging Face cache or network access to fetch them.
+
+Usage (from backend/):
+    python -m benchmarks.whisper_decoding --clips ~/articulink-clips
+    python -m benchmarks.whisper_decoding --clips ~/articulink-clips --draft openai/whisper-tiny --repeats 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+AUDIO_EXTENSIONS = (".wav", ".m4a", ".3gp", ".aac", ".mp3", ".ogg", ".flac", ".webm", ".amr")
+
+
+def find_clips(directory: str, limit: int):
+    clips = sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(os.path.expanduser(directory))
+        for name in names
+        if name.lower().endswith(AUDIO_EXTENSIONS)
+    )
+    return clips[:limit] if limit else clips
+
+
+def best_of(repeats: int, fn):
+    """Fastest of several runs (least disturbed by other load) and the last result"""
+    timings = []
+    result = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main(args: argparse.Namespace):
+    clips = find_clips(args.clips, args.limit)
+    if not clips:
+        sys.exit(f"No audio clips found under {args.clips}")
+
+    # The verifier is whatever WHISPER_MODEL the app is configured with
+    os.environ["WHISPER_DRAFT_MODEL"] = ""
+    import librosa
+    import torch
+    from app.utils import whisper
+
+    print(f"Verifier {whisper.WHISPER_MODEL}, draft {args.draft}, device {whisper.device}, "
+          f"{len(clips)} clips, best of {args.repeats}")
+    draft = whisper.load_model(args.draft)
+
+    features = []
+    for path in clips:
+        audio, _ = librosa.load(path, sr=16000, mono=True)
+        inputs = whisper.processor(audio, sampling_rate=16000, return_tensors="pt")
+        features.append((path, len(audio) / 16000, inputs.input_features.to(whisper.device, dtype=whisper.dtype)))
+
+    # Warm up both paths (allocations, kernel selection)
+    whisper.generate_ids(features[0][2], assistant_model=None)
+    whisper.generate_ids(features[0][2], assistant_model=draft)
+
+    print(f"{'clip':<32} {'audio s':>8} {'tokens':>7} {'greedy ms':>10} {'assisted ms':>12} {'speedup':>8} {'same':>5}")
+    greedy_total = assisted_total = 0.0
+    speedups = []
+    mismatches = []
+    for path, seconds, input_features in features:
+        greedy_s, greedy_ids = best_of(args.repeats, lambda: whisper.generate_ids(input_features, assistant_model=None))
+        assisted_s, assisted_ids = best_of(args.repeats, lambda: whisper.generate_ids(input_features, assistant_model=draft))
+        same = torch.equal(greedy_ids, assisted_ids)
+        if not same:
+            mismatches.append((
+                path,
+                whisper.processor.batch_decode(greedy_ids, skip_special_tokens=True)[0].strip(),
+                whisper.processor.batch_decode(assisted_ids, skip_special_tokens=True)[0].strip()
+            ))
+
+        greedy_total += greedy_s
+        assisted_total += assisted_s
+        speedups.append(greedy_s / assisted_s)
+        print(f"{os.path.basename(path)[:32]:<32} {seconds:>8.1f} {greedy_ids.shape[-1]:>7} {greedy_s * 1000:>10.1f} "
+              f"{assisted_s * 1000:>12.1f} {greedy_s / assisted_s:>7.2f}x {'yes' if same else 'NO':>5}")
+
+    print(f"\nTotal decode time: greedy {greedy_total:.2f}s, assisted {assisted_total:.2f}s "
+          f"({greedy_total / assisted_total:.2f}x overall, median {statistics.median(speedups):.2f}x per clip)")
+    print(f"Identical output on {len(features) - len(mismatches)}/{len(features)} clips")
+    for path, greedy_text, assisted_text in mismatches:
+        print(f"  {path}\n    greedy:   {greedy_text}\n    assisted: {assisted_text}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Whisper speculative decoding against plain greedy decoding")
+    parser.add_argument("--clips", required=True, help="Directory of audio clips (searched recursively)")
+    parser.add_argument("--draft", default="openai/whisper-tiny", help="Draft model for assisted decoding")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per clip and mode; the fastest is reported")
+    parser.add_argument("--limit", type=int, default=0, help="Only use the first N clips")
+    main(parser.parse_args())
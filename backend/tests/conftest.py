@@ -0,0 +1,102 @@
+import os
+
+# Configure the app for offline tests before anything imports app.db.database
+os.environ.setdefault("MONGO_URI", "memory")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("GEMINI_BACKEND", "stub")
+os.environ.setdefault("GEMINI_STUB_LATENCY_MS", "0")
+os.environ.setdefault("MEDIA_STORAGE_BACKEND", "local")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+# Every TestClient login comes from the same address
+os.environ.setdefault("LOGIN_IP_BURST", "1000000")
+os.environ.setdefault("LOGIN_IP_PER_MINUTE", "1000000")
+
+import asyncio
+import sys
+import types
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+# ============================================================================
+# USERS
+# ============================================================================
+
+def _register_user(client, **fields):
+    """Register a new account; returns (request payload, response JSON)"""
+    payload = {"email": f"{uuid.uuid4().hex[:10]}@example.com", "password": "secret123", **fields}
+    response = client.post("/api/v1/auth/register", json=payload)
+    assert response.status_code == 201, response.text
+    return payload, response.json()
+
+
+def _login_user(client, payload):
+    """Log in with a register payload; returns the token response JSON"""
+    response = client.post("/api/v1/auth/login", json={"email": payload["email"], "password": payload["password"]})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _new_user(client):
+    """Register and log in a fresh account; returns its Authorization header"""
+    payload, _ = _register_user(client)
+    return {"Authorization": f"Bearer {_login_user(client, payload)['access_token']}"}
+
+
+@pytest.fixture
+def register_user():
+    return _register_user
+
+
+@pytest.fixture
+def login_user():
+    return _login_user
+
+
+@pytest.fixture
+def new_user():
+    return _new_user
+
+# ============================================================================
+# WHISPER
+# ============================================================================
+
+@pytest.fixture(scope="session")
+def fake_whisper_module():
+    """
+    Stand-in for app.utils.whisper, which needs torch and model weights
+
+    Installed for the whole session; modules that imported the real one are
+    dropped so they re-import this.
+    """
+    module = types.ModuleType("app.utils.whisper")
+
+    async def run_transcription(path):
+        module.calls += 1
+        if module.delay:
+            await asyncio.sleep(module.delay)
+        if isinstance(module.result, Exception):
+            raise module.result
+        return module.result if module.result is not None else f"text of {os.path.basename(path)}"
+
+    module.run_transcription = run_transcription
+    module.shutdown_whisper_executor = lambda: None
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setitem(sys.modules, "app.utils.whisper", module)
+        for name in ("app.routes.transcribe", "app.routes.voice"):
+            patch.delitem(sys.modules, name, raising=False)
+        yield module
+
+
+@pytest.fixture
+def whisper(fake_whisper_module):
+    """The fake Whisper, reset: returns "text of <file name>" unless .result is set, after .delay seconds"""
+    fake_whisper_module.result = None
+    fake_whisper_module.delay = 0
+    fake_whisper_module.calls = 0
+    return fake_whisper_module
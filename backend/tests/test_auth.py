@@ -0,0 +1,129 @@
+from datetime import date, datetime
+
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from app.models.user import (
+    UserOut, UserUpdateResponse, Token,
+    user_to_response, profile_update_response, login_user_payload,
+    render_user_out, render_profile_update, render_token
+)
+
+FULL_USER = {
+    "_id": ObjectId(),
+    "email": "ada@example.com",
+    "password": "hashed",
+    "first_name": "Ada",
+    "last_name": "Lovelace",
+    "role": "user",
+    "profile_pic": "https://cdn.example.com/ada_500.webp",
+    "profile_pic_variants": {"64": "https://cdn.example.com/ada_64.webp"},
+    "birthdate": "1999-04-12",
+    "gender": "female",
+    "status": "active",
+    "created_at": datetime(2025, 1, 2, 3, 4, 5, 678000),
+    "updated_at": datetime(2025, 6, 7, 8, 9, 10, 111000),
+}
+SPARSE_USER = {"_id": ObjectId(), "email": "bob@example.com", "birthdate": date(2001, 2, 3)}
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(create_app("auth")) as client:
+        yield client
+
+
+def test_register_returns_user_out(client, register_user, login_user):
+    payload, user = register_user(client)
+    assert user["email"] == payload["email"]
+    assert user["role"] == "user"
+    assert user["status"] == "active"
+    assert user["created_at"] and user["updated_at"]
+    assert "password" not in user
+
+
+@pytest.mark.parametrize("user", [FULL_USER, SPARSE_USER], ids=["full", "sparse"])
+def test_pre_serialized_responses_match_response_model(user):
+    # What FastAPI would send after validating the mapped dict against response_model
+    assert render_user_out(user) == UserOut.model_validate(user_to_response(user)).model_dump_json().encode()
+    assert render_profile_update(user, "Saved") == \
+        UserUpdateResponse.model_validate(profile_update_response(user, "Saved")).model_dump_json().encode()
+    token = {"access_token": "t", "refresh_token": "", "token_type": "bearer", "user": login_user_payload(user)}
+    assert render_token("t", user) == Token.model_validate(token).model_dump_json().encode()
+
+
+def test_duplicate_email_is_rejected(client, register_user, login_user):
+    payload, _ = register_user(client)
+    response = client.post("/api/v1/auth/register", json=payload)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already registered"
+
+
+def test_login_payload_shape(client, register_user, login_user):
+    payload, user = register_user(client)
+    token = login_user(client, payload)
+
+    assert token["token_type"] == "bearer"
+    assert token["refresh_token"] == ""
+    assert list(token["user"]) == [
+        "_id", "email", "first_name", "last_name", "role", "profile_pic",
+        "profile_pic_variants", "birthdate", "gender", "status"
+    ]
+    assert token["user"]["_id"] == user["id"]
+
+
+def test_me_and_profile_update(client, register_user, login_user):
+    payload, user = register_user(client)
+    headers = {"Authorization": f"Bearer {login_user(client, payload)['access_token']}"}
+
+    me = client.get("/api/v1/auth/me", headers=headers).json()
+    # Stored timestamps are truncated to milliseconds, so compare the rest
+    assert {k: v for k, v in me.items() if not k.endswith("_at")} == \
+        {k: v for k, v in user.items() if not k.endswith("_at")}
+
+    response = client.put("/api/v1/auth/profile", json={"last_name": "Lovelace"}, headers=headers)
+    assert response.status_code == 200
+    updated = response.json()
+    assert updated["last_name"] == "Lovelace"
+    assert updated["message"] == "Profile updated successfully"
+    # Profile updates keep their original shape: model defaults, not stored values
+    assert updated["status"] == "active"
+    assert updated["created_at"] is None
+    assert updated["updated_at"] is None
+
+
+def test_register_is_a_single_insert(client, monkeypatch, register_user, login_user):
+    from app.routes import auth
+
+    async def unexpected(*args, **kwargs):
+        raise AssertionError("register must not pre-read the user")
+
+    monkeypatch.setattr(auth, "get_user_by_email", unexpected)
+    payload, _ = register_user(client)
+    # Duplicates are still caught, by the unique email index
+    assert client.post("/api/v1/auth/register", json=payload).status_code == 400
+
+
+def test_profile_update_is_a_single_update(client, monkeypatch, register_user, login_user):
+    from app.routes import auth
+
+    payload, _ = register_user(client)
+    headers = {"Authorization": f"Bearer {login_user(client, payload)['access_token']}"}
+
+    async def unexpected(*args, **kwargs):
+        raise AssertionError("update_profile must not pre-read the user")
+
+    monkeypatch.setattr(auth, "get_user_by_id", unexpected)
+    response = client.put("/api/v1/auth/profile", json={"first_name": "Grace"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["first_name"] == "Grace"
+
+    async def no_match(user_id, update_data):
+        return None
+
+    # The account vanished between authentication and the update
+    monkeypatch.setattr(auth, "update_user", no_match)
+    response = client.put("/api/v1/auth/profile", json={"first_name": "Gone"}, headers=headers)
+    assert response.status_code == 404
@@ -0,0 +1,158 @@
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db.database import db
+from app.main import create_app
+from app.routes import admin
+from app.utils import bulk_import
+from app.utils.bulk_import import detect_format, import_users, parse_rows, validate_rows
+from app.utils.tokens import create_access_token
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def fast_hashing(monkeypatch):
+    """Threads and a trivial hash instead of bcrypt on a process pool"""
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(bulk_import, "get_hash_pool", lambda: pool)
+    monkeypatch.setattr(bulk_import, "hash_password", lambda password: f"hashed:{password}")
+    yield
+    pool.shutdown()
+
+
+def email(name="user"):
+    return f"{name}.{uuid.uuid4().hex[:8]}@example.com"
+
+# ============================================================================
+# PARSING / VALIDATION
+# ============================================================================
+
+def test_detect_format():
+    assert detect_format("users.CSV") == "csv"
+    assert detect_format("users.ndjson") == "jsonl"
+    assert detect_format(None, "application/x-ndjson") == "jsonl"
+    with pytest.raises(ValueError):
+        detect_format("users.xlsx")
+
+
+def test_csv_rows_drop_empty_cells():
+    text = "email, first_name ,gender\na@example.com,Ada,\nb@example.com,,female\n"
+
+    assert list(parse_rows(text, "csv")) == [
+        (1, {"email": "a@example.com", "first_name": "Ada"}),
+        (2, {"email": "b@example.com", "gender": "female"}),
+    ]
+
+
+def test_jsonl_rows_skip_blank_lines_and_report_bad_json():
+    text = '{"email": "a@example.com"}\n\n{not json}\n[1, 2]\n'
+
+    rows = list(parse_rows(text, "jsonl"))
+
+    assert rows[0] == (1, {"email": "a@example.com"})
+    assert rows[1][0] == 2 and rows[1][1].startswith("Invalid JSON:")
+    assert rows[2] == (3, [1, 2])
+
+
+def test_validation_errors_and_in_file_duplicates():
+    rows = [
+        (1, {"email": "Dup@Example.com", "password": "secret123"}),
+        (2, {"email": "not-an-email", "password": "secret123"}),
+        (3, {"email": "ok@example.com", "password": "123"}),
+        (4, "Invalid JSON: Expecting value"),
+        (5, [1, 2]),
+        (6, {"email": "dup@example.com", "password": "secret123"}),
+    ]
+
+    valid, errors = validate_rows(rows)
+
+    assert [row for row, _ in valid] == [1]
+    by_row = {e["row"]: e for e in errors}
+    assert sorted(by_row) == [2, 3, 4, 5, 6]
+    assert by_row[2]["error"].startswith("email:")
+    assert by_row[3]["error"].startswith("password:")
+    assert by_row[4]["error"] == "Invalid JSON: Expecting value"
+    assert by_row[5]["error"] == "Row must be an object"
+    assert by_row[6] == {"row": 6, "email": "dup@example.com", "error": "Duplicate email in import file"}
+
+# ============================================================================
+# INSERTS
+# ============================================================================
+
+async def test_existing_emails_map_back_to_file_rows_across_batches(fast_hashing):
+    await db.users.create_index("email", unique=True)
+    taken = [email("taken"), email("taken")]
+    await db.users.insert_many([{"email": address} for address in taken])
+
+    addresses = [email() for _ in range(5)]
+    # Rows 2 and 5 collide with existing accounts; with batches of 2 they land in batches 1 and 3
+    addresses[1], addresses[4] = taken
+    rows = [(number, {"email": address, "password": "secret123"}) for number, address in enumerate(addresses, start=1)]
+
+    summary = await import_users(rows, batch_size=2)
+
+    assert (summary["total"], summary["inserted"], summary["failed"]) == (5, 3, 2)
+    assert [(e["row"], e["email"], e["error"]) for e in summary["errors"]] == [
+        (2, taken[0], "Email already registered"),
+        (5, taken[1], "Email already registered"),
+    ]
+    stored = await db.users.find_one({"email": addresses[0]})
+    assert stored["password"] == "hashed:secret123"
+    assert stored["role"] == "user" and stored["status"] == "active"
+
+# ============================================================================
+# ENDPOINT
+# ============================================================================
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(create_app("auth,admin")) as client:
+        yield client
+
+
+@pytest.fixture
+def admin_headers(client, register_user):
+    _, user = register_user(client, role="admin")
+    return {"Authorization": f"Bearer {create_access_token(user['id'])}"}
+
+
+def upload(client, headers, name, content):
+    return client.post("/api/v1/admin/users/import", files={"file": (name, content, "application/octet-stream")},
+                       headers=headers)
+
+
+def test_import_endpoint(client, admin_headers, fast_hashing):
+    lines = [json.dumps({"email": email(), "password": "secret123"}) for _ in range(3)] + ["{broken"]
+
+    response = upload(client, admin_headers, "users.jsonl", "\n".join(lines).encode())
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["total"], body["inserted"], body["failed"]) == (4, 3, 1)
+    assert body["errors"][0]["row"] == 4
+
+
+def test_import_requires_admin(client, new_user):
+    assert upload(client, new_user(client), "users.csv", b"email,password\n").status_code == 403
+
+
+def test_import_rejects_too_many_rows(client, admin_headers, fast_hashing, monkeypatch):
+    monkeypatch.setattr(admin, "MAX_IMPORT_ROWS", 2)
+    text = "email,password\n" + "".join(f"{email()},secret123\n" for _ in range(3))
+
+    response = upload(client, admin_headers, "users.csv", text.encode())
+
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Import file exceeds 2 rows"
+
+
+def test_import_rejects_oversized_file(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(admin, "MAX_IMPORT_BYTES", 1024)
+    text = "email,password\n" + "".join(f"{email()},secret123\n" for _ in range(100))
+
+    assert upload(client, admin_headers, "users.csv", text.encode()).status_code == 413
@@ -0,0 +1,132 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from app.routes import chat
+from app.utils import chat_sessions
+from app.utils.chat_window import chat_window, CHAT_CONTEXT_TURNS
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(create_app("auth,chat")) as client:
+        yield client
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    """Records the context of every reply and summary request"""
+    calls = {"reply": [], "summary": []}
+
+    async def fake_reply(messages, user_summary=None):
+        calls["reply"].append(list(messages))
+        return f"reply {len(calls['reply'])}"
+
+    async def fake_summary(messages, user_summary=None):
+        calls["summary"].append(list(messages))
+        return "Practises /r/ sounds"
+
+    monkeypatch.setattr(chat, "generate_gemini_reply", fake_reply)
+    monkeypatch.setattr(chat_sessions, "generate_gemini_reply", fake_summary)
+    return calls
+
+
+def send(client, headers, message, session_id=None):
+    body = {"message": message}
+    if session_id:
+        body["session_id"] = session_id
+    return client.post("/api/v1/message", json=body, headers=headers)
+
+
+def test_first_message_creates_a_session(client, gemini, new_user):
+    headers = new_user(client)
+
+    response = send(client, headers, "hello")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["content"] == "reply 1"
+    session = client.get(f"/api/v1/sessions/{body['session_id']}", headers=headers).json()
+    assert session["turn_count"] == 2
+    assert [t["role"] for t in session["turns"]] == ["user", "assistant"]
+
+
+def test_context_is_truncated_to_the_window(client, gemini, new_user):
+    headers = new_user(client)
+    session_id = send(client, headers, "message 0").json()["session_id"]
+    for i in range(1, 6):
+        assert send(client, headers, f"message {i}", session_id).status_code == 200
+
+    # Window of the last CHAT_CONTEXT_TURNS stored turns plus the new message
+    context = gemini["reply"][-1]
+    assert len(context) == CHAT_CONTEXT_TURNS + 1
+    assert context[-1] == {"role": "user", "content": "message 5"}
+    assert context[0]["content"] == f"message {5 - CHAT_CONTEXT_TURNS // 2}"
+
+    # Rebuilding the window from Mongo (e.g. on another worker) gives the same context
+    user_id = client.get("/api/v1/auth/me", headers=headers).json()["id"]
+    chat_window.discard(user_id, session_id)
+    send(client, headers, "message 6", session_id)
+    expected = [t["content"] for t in context[2:]] + [f"reply {len(gemini['reply']) - 1}", "message 6"]
+    assert [t["content"] for t in gemini["reply"][-1]] == expected
+
+    session = client.get(f"/api/v1/sessions/{session_id}", headers=headers).json()
+    assert session["turn_count"] == 14
+
+
+def test_memory_summary_refreshes_every_fifteen_turns(client, gemini, new_user):
+    headers = new_user(client)
+    session_id = send(client, headers, "message 0").json()["session_id"]
+    for i in range(1, 7):
+        send(client, headers, f"message {i}", session_id)
+    assert gemini["summary"] == []
+
+    # The eighth exchange takes the session from 14 to 16 turns
+    send(client, headers, "message 7", session_id)
+    assert len(gemini["summary"]) == 1
+    # Every stored turn, followed by the summary prompt
+    assert len(gemini["summary"][0]) == 16 + 1
+
+
+def test_foreign_and_invalid_session_ids_are_not_found(client, gemini, new_user):
+    owner = new_user(client)
+    other = new_user(client)
+    session_id = send(client, owner, "mine").json()["session_id"]
+
+    assert send(client, other, "hijack", session_id).status_code == 404
+    assert client.get(f"/api/v1/sessions/{session_id}", headers=other).status_code == 404
+    assert client.delete(f"/api/v1/sessions/{session_id}", headers=other).status_code == 404
+    assert send(client, owner, "hello", "not-an-object-id").status_code == 404
+    assert send(client, owner, "hello", str(uuid.uuid4().hex[:24])).status_code == 404
+
+    # The owner's session is untouched
+    assert client.get(f"/api/v1/sessions/{session_id}", headers=owner).json()["turn_count"] == 2
+
+
+def test_deleted_session_is_gone(client, gemini, new_user):
+    headers = new_user(client)
+    session_id = send(client, headers, "hello").json()["session_id"]
+
+    assert client.delete(f"/api/v1/sessions/{session_id}", headers=headers).status_code == 200
+    assert send(client, headers, "again", session_id).status_code == 404
+
+
+def test_empty_message_is_rejected(client, gemini, new_user):
+    headers = new_user(client)
+    assert send(client, headers, "   ").status_code == 400
+    assert gemini["reply"] == []
+
+
+def test_legacy_full_history_body(client, gemini, new_user):
+    headers = new_user(client)
+    messages = [{"role": "user" if i % 2 == 0 else "assistant", "content": f"turn {i}"} for i in range(15)]
+
+    response = client.post("/api/v1/message", json={"messages": messages}, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == {"role": "assistant", "content": "reply 1"}
+    assert gemini["reply"][0] == messages[-CHAT_CONTEXT_TURNS:]
+    # 15 messages is a summary boundary for the legacy flow
+    assert gemini["summary"][0][:-1] == messages
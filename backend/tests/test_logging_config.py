@@ -0,0 +1,46 @@
+import json
+import logging
+import queue
+import sys
+
+from app.utils.logging_config import DeferredQueueHandler, JsonFormatter
+
+
+def enqueue(record: logging.LogRecord) -> logging.LogRecord:
+    log_queue = queue.SimpleQueue()
+    DeferredQueueHandler(log_queue).handle(record)
+    return log_queue.get_nowait()
+
+
+def make_record(msg, args=None, exc_info=None) -> logging.LogRecord:
+    return logging.LogRecord("app.test", logging.ERROR, __file__, 1, msg, args, exc_info)
+
+
+def test_message_is_rendered_before_arguments_change():
+    data = {"status": "queued"}
+    queued = enqueue(make_record("job %s", (data,)))
+    data["status"] = "done"
+
+    assert queued.getMessage() == "job {'status': 'queued'}"
+    assert queued.args is None
+
+
+def test_traceback_is_rendered_to_text():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        queued = enqueue(make_record("failed", exc_info=sys.exc_info()))
+
+    assert queued.exc_info is None
+    assert "ValueError: boom" in queued.exc_text
+
+    text = logging.Formatter("%(message)s").format(queued)
+    assert text.startswith("failed\nTraceback")
+    assert "ValueError: boom" in json.loads(JsonFormatter().format(queued))["exc_info"]
+
+
+def test_caller_record_is_left_untouched():
+    record = make_record("user %s", ("u1",))
+    enqueue(record)
+    assert record.msg == "user %s"
+    assert record.args == ("u1",)
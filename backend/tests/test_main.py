@@ -0,0 +1,27 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.utils import bulk_import
+
+
+def test_resolve_routers_expands_groups_without_duplicates():
+    assert main.resolve_routers("api,auth") == ["auth", "chat", "admin"]
+    assert main.resolve_routers(["admin", "voice"]) == ["admin", "voice"]
+    with pytest.raises(ValueError):
+        main.resolve_routers("nope")
+
+
+@pytest.mark.parametrize("services, expected", [
+    ("admin", 1),
+    ("auth", 0),
+    ("auth,admin", 1),
+])
+def test_hash_pool_is_shut_down_with_the_admin_router(monkeypatch, services, expected):
+    calls = []
+    monkeypatch.setattr(bulk_import, "shutdown_hash_pool", lambda: calls.append(True))
+
+    with TestClient(main.create_app(services)) as client:
+        assert client.get("/health").json()["routers"] == services.split(",")
+
+    assert len(calls) == expected
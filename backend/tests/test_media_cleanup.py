@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import media_cleanup
+from app.models.media_cleanup import claim_media_cleanup_batch, count_media_cleanup, enqueue_media_cleanup
+from app.utils import media_cleanup_worker
+from app.utils.media_cleanup_worker import backoff_seconds, drain_once
+
+pytestmark = pytest.mark.anyio
+
+MAX_ATTEMPTS = 3
+
+
+@pytest.fixture
+async def storage(monkeypatch):
+    """Fake delete_profile_pictures: confirms ids unless listed in .unconfirmed, or raises .error"""
+    await media_cleanup.COLLECTION.delete_many({})
+
+    class FakeStorage:
+        def __init__(self):
+            self.unconfirmed = set()
+            self.error = None
+            self.calls = []
+
+        async def delete(self, public_ids):
+            self.calls.append(sorted(public_ids))
+            if self.error:
+                raise self.error
+            return {public_id: public_id not in self.unconfirmed for public_id in public_ids}
+
+    fake = FakeStorage()
+    monkeypatch.setattr(media_cleanup_worker, "delete_profile_pictures", fake.delete)
+    monkeypatch.setattr(media_cleanup_worker, "MEDIA_CLEANUP_MAX_ATTEMPTS", MAX_ATTEMPTS)
+    return fake
+
+
+async def job(public_id):
+    return await media_cleanup.COLLECTION.find_one({"public_id": public_id})
+
+
+async def make_due(public_id):
+    await media_cleanup.COLLECTION.update_one(
+        {"public_id": public_id}, {"$set": {"next_attempt_at": datetime.utcnow() - timedelta(seconds=1)}}
+    )
+
+
+def test_backoff_doubles_and_is_capped():
+    assert [backoff_seconds(n) for n in range(4)] == [30, 60, 120, 240]
+    assert backoff_seconds(30) == media_cleanup_worker.BACKOFF_MAX_SECONDS
+
+
+async def test_confirmed_deletions_are_removed_from_the_queue(storage):
+    await enqueue_media_cleanup(["p/a", "p/b", "p/a"], reason="replaced")
+
+    assert await drain_once() == 3
+
+    # Duplicate ids go to the backend once
+    assert storage.calls == [["p/a", "p/b"]]
+    assert await count_media_cleanup() == {"pending": 0, "failed": 0}
+    assert await drain_once() == 0
+
+
+async def test_unconfirmed_deletion_is_retried_with_backoff(storage):
+    await enqueue_media_cleanup(["p/a", "p/b"])
+    storage.unconfirmed = {"p/b"}
+
+    before = datetime.utcnow()
+    await drain_once()
+
+    retried = await job("p/b")
+    assert retried["status"] == "pending"
+    assert retried["attempts"] == 1
+    assert retried["last_error"] == "Storage backend did not confirm deletion"
+    assert "lease_id" not in retried
+    delay = (retried["next_attempt_at"] - before).total_seconds()
+    assert backoff_seconds(1) - 1 <= delay <= backoff_seconds(1) + 1
+    assert await job("p/a") is None
+
+    # Not due again until the backoff passes
+    assert await drain_once() == 0
+
+
+async def test_backend_errors_retry_every_job(storage):
+    await enqueue_media_cleanup(["p/a", "p/b"])
+    storage.error = TimeoutError("storage timed out")
+
+    await drain_once()
+
+    for public_id in ("p/a", "p/b"):
+        assert (await job(public_id))["last_error"] == "storage timed out"
+    assert await count_media_cleanup() == {"pending": 2, "failed": 0}
+
+
+async def test_gives_up_after_max_attempts(storage):
+    await enqueue_media_cleanup(["p/stuck"])
+    storage.unconfirmed = {"p/stuck"}
+
+    for _ in range(MAX_ATTEMPTS):
+        await make_due("p/stuck")
+        assert await drain_once() == 1
+
+    failed = await job("p/stuck")
+    assert failed["status"] == "failed"
+    assert failed["attempts"] == MAX_ATTEMPTS
+    assert await count_media_cleanup() == {"pending": 0, "failed": 1}
+
+    # Parked jobs are never claimed again
+    await make_due("p/stuck")
+    assert await drain_once() == 0
+
+
+async def test_claimed_jobs_are_leased_until_it_expires(storage):
+    await enqueue_media_cleanup(["p/a", "p/b", "p/c"])
+
+    first = await claim_media_cleanup_batch(2, lease_seconds=300)
+    assert len(first) == 2
+    assert len({doc["lease_id"] for doc in first}) == 1
+
+    # Leased jobs are skipped; only the unclaimed one is handed out
+    second = await claim_media_cleanup_batch(10, lease_seconds=300)
+    assert [doc["public_id"] for doc in second] == ["p/c"]
+    assert await claim_media_cleanup_batch(10, lease_seconds=300) == []
+
+    # A worker that died mid-batch only delays its jobs
+    await make_due(first[0]["public_id"])
+    reclaimed = await claim_media_cleanup_batch(10, lease_seconds=300)
+    assert [doc["public_id"] for doc in reclaimed] == [first[0]["public_id"]]
+    assert reclaimed[0]["lease_id"] != first[0]["lease_id"]
@@ -0,0 +1,50 @@
+import pytest
+
+from app.utils.media_storage import LocalStorage, MediaStorage, shutdown_media_executor
+
+pytestmark = pytest.mark.anyio
+
+
+def test_backends_must_implement_the_interface():
+    with pytest.raises(TypeError):
+        MediaStorage()
+
+    class Incomplete(MediaStorage):
+        async def upload(self, data, folder, public_id, format):
+            return {}
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+async def test_local_storage_round_trip(tmp_path):
+    storage = LocalStorage(root=str(tmp_path), base_url="http://media.test/")
+
+    result = await storage.upload(b"webp", folder="articuLink/profiles/u1", public_id="abc_64", format="webp")
+
+    assert result == {
+        "secure_url": "http://media.test/media/articuLink/profiles/u1/abc_64.webp",
+        "public_id": "articuLink/profiles/u1/abc_64"
+    }
+    assert storage.public_id_from_url(result["secure_url"]) == result["public_id"]
+    assert (tmp_path / "articuLink/profiles/u1/abc_64.webp").read_bytes() == b"webp"
+
+    assert await storage.delete_many([result["public_id"], "articuLink/missing"]) == {
+        result["public_id"]: True,
+        "articuLink/missing": True
+    }
+    assert not (tmp_path / "articuLink/profiles/u1/abc_64.webp").exists()
+
+
+async def test_local_storage_rejects_paths_outside_root(tmp_path):
+    storage = LocalStorage(root=str(tmp_path))
+    with pytest.raises(ValueError):
+        await storage.upload(b"x", folder="..", public_id="escape", format="webp")
+
+
+async def test_storage_calls_work_after_executor_shutdown(tmp_path):
+    storage = LocalStorage(root=str(tmp_path))
+    shutdown_media_executor()
+
+    result = await storage.upload(b"x", folder="after", public_id="restart", format="webp")
+    assert result["public_id"] == "after/restart"
@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.utils import metrics
+from app.utils.metrics import MetricsMiddleware
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def requests_recorded(method, route, status):
+    return sample("http_request_duration_seconds_count", method=method, route=route, status=status)
+
+
+def in_flight(method):
+    return sample("http_requests_in_progress", method=method)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    seen_in_flight = []
+
+    @app.get("/metrics-test/items/{item_id}")
+    async def get_item(item_id: int):
+        seen_in_flight.append(in_flight("GET"))
+        return {"id": item_id}
+
+    @app.put("/metrics-test/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    app.add_middleware(MetricsMiddleware)
+    client = TestClient(app, raise_server_exceptions=False)
+    client.seen_in_flight = seen_in_flight
+    return client
+
+
+def test_requests_are_labelled_by_route_template(client):
+    template = "/metrics-test/items/{item_id}"
+    before = requests_recorded("GET", template, "200")
+
+    for item_id in (1, 2, 3):
+        assert client.get(f"/metrics-test/items/{item_id}").status_code == 200
+
+    assert requests_recorded("GET", template, "200") - before == 3
+    # Raw paths never become labels
+    assert requests_recorded("GET", "/metrics-test/items/1", "200") == 0
+
+
+def test_unknown_paths_are_recorded_as_unmatched(client):
+    before = requests_recorded("GET", "unmatched", "404")
+
+    assert client.get("/metrics-test/nope/123").status_code == 404
+
+    assert requests_recorded("GET", "unmatched", "404") - before == 1
+
+
+def test_unhandled_errors_are_recorded_as_500(client):
+    before = requests_recorded("PUT", "/metrics-test/boom", "500")
+
+    assert client.put("/metrics-test/boom").status_code == 500
+
+    assert requests_recorded("PUT", "/metrics-test/boom", "500") - before == 1
+
+
+def test_in_flight_gauge_returns_to_zero(client):
+    idle = in_flight("GET")
+
+    client.get("/metrics-test/items/1")
+    client.put("/metrics-test/boom")
+
+    assert client.seen_in_flight == [idle + 1]
+    assert in_flight("GET") == idle
+    assert in_flight("PUT") == 0
+
+
+def test_metrics_endpoint_exposes_recorded_series():
+    from app.main import create_app
+
+    with TestClient(create_app("chat")) as client:
+        client.get("/health")
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in response.text
+
+
+@pytest.mark.anyio
+async def test_event_loop_lag_monitor_records_blocked_loop():
+    count_before = sample("event_loop_lag_seconds_count")
+    slow_before = count_before - sample("event_loop_lag_seconds_bucket", le="0.025")
+
+    monitor = asyncio.create_task(metrics._monitor_event_loop_lag(0.01))
+    await asyncio.sleep(0.02)
+    time.sleep(0.1)  # block the loop
+    await asyncio.sleep(0.03)
+    monitor.cancel()
+    await asyncio.gather(monitor, return_exceptions=True)
+
+    assert sample("event_loop_lag_seconds_count") > count_before
+    # The blocked tick landed above the 25 ms bucket
+    assert sample("event_loop_lag_seconds_count") - sample("event_loop_lag_seconds_bucket", le="0.025") > slow_before
+
+
+@pytest.mark.anyio
+async def test_event_loop_monitor_start_and_stop():
+    metrics.start_event_loop_monitor()
+    task = metrics._lag_task
+    metrics.start_event_loop_monitor()
+    assert metrics._lag_task is task
+
+    await metrics.stop_event_loop_monitor()
+    assert task.cancelled()
+    assert metrics._lag_task is None
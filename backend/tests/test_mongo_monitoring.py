@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+from app.db.monitoring import MongoMetricsListener
+from prometheus_client import REGISTRY
+
+
+def started(request_id, command_name, command):
+    return SimpleNamespace(connection_id=("db", 27017), request_id=request_id,
+                           command_name=command_name, command=command)
+
+
+def finished(request_id, command_name, duration_ms):
+    return SimpleNamespace(connection_id=("db", 27017), request_id=request_id,
+                           command_name=command_name, duration_micros=int(duration_ms * 1000))
+
+
+def observed(collection, operation, outcome="success"):
+    labels = {"collection": collection, "operation": operation, "outcome": outcome}
+    return REGISTRY.get_sample_value("mongo_operation_duration_seconds_count", labels) or 0
+
+
+def test_one_listener_feeds_histogram_stats_and_slow_log():
+    listener = MongoMetricsListener(slow_ms=50)
+    before = observed("monitoring_users", "find")
+
+    listener.started(started(1, "find", {"find": "monitoring_users", "filter": {"email": "a@b.c"}}))
+    listener.succeeded(finished(1, "find", 5))
+    listener.started(started(2, "find", {"find": "monitoring_users", "filter": {"email": "a@b.c"}}))
+    listener.succeeded(finished(2, "find", 80))
+
+    after = observed("monitoring_users", "find")
+    assert after - before == 2
+
+    [row] = listener.snapshot()
+    assert (row["collection"], row["operation"], row["count"], row["slow"]) == ("monitoring_users", "find", 2, 1)
+
+    [slow] = listener.slow_ops
+    assert slow["shape"] == ["email"]
+    assert "a@b.c" not in str(slow)
+
+
+def test_admin_commands_are_timed_but_not_aggregated():
+    listener = MongoMetricsListener()
+    before = observed("-", "ping")
+
+    listener.started(started(1, "ping", {"ping": 1}))
+    listener.succeeded(finished(1, "ping", 1))
+
+    after = observed("-", "ping")
+    assert after - before == 1
+    assert listener.snapshot() == []
+
+
+def test_pending_commands_are_bounded():
+    listener = MongoMetricsListener(max_pending=3)
+    for request_id in range(10):
+        listener.started(started(request_id, "find", {"find": "monitoring_orphans"}))
+
+    assert len(listener._pending) == 3
+    # The most recent commands are the ones kept
+    listener.failed(finished(9, "find", 1))
+    assert listener.snapshot()[0]["failures"] == 1
@@ -0,0 +1,89 @@
+import asyncio
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+
+from app.utils import cloudinary_helper
+from app.utils.cloudinary_helper import preprocess_profile_picture, upload_profile_picture
+
+pytestmark = pytest.mark.anyio
+
+
+def png(width: int, height: int) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), "white").save(out, format="PNG")
+    return out.getvalue()
+
+
+class FlakyStorage:
+    """Fails the upload of one variant size and records everything else"""
+
+    name = "flaky"
+
+    def __init__(self, failing_size: int):
+        self.failing_size = failing_size
+        self.uploaded = []
+
+    async def upload(self, data, folder, public_id, format):
+        if public_id.endswith(f"_{self.failing_size}"):
+            raise asyncio.TimeoutError()
+        full_id = f"{folder}/{public_id}"
+        self.uploaded.append(full_id)
+        return {"secure_url": f"https://media.test/{full_id}.{format}", "public_id": full_id}
+
+
+def test_preprocess_produces_square_variants():
+    variants = preprocess_profile_picture(png(300, 200), sizes=(64, 128))
+    assert sorted(variants) == [64, 128]
+    with Image.open(io.BytesIO(variants[64])) as img:
+        assert img.format == "WEBP"
+        assert img.size == (64, 64)
+
+
+def test_preprocess_rejects_images_over_pixel_limit():
+    with pytest.raises(Image.DecompressionBombError):
+        preprocess_profile_picture(png(200, 200), max_pixels=200 * 199)
+
+
+def test_pixel_limit_leaves_global_pillow_setting_alone():
+    assert Image.MAX_IMAGE_PIXELS != cloudinary_helper.MAX_IMAGE_PIXELS
+
+
+async def test_failed_variant_queues_uploaded_ones_for_cleanup(monkeypatch):
+    storage = FlakyStorage(failing_size=128)
+    queued = []
+
+    async def fake_enqueue(public_ids, reason="replaced"):
+        queued.append((list(public_ids), reason))
+
+    monkeypatch.setattr(cloudinary_helper, "get_media_storage", lambda: storage)
+    monkeypatch.setattr(cloudinary_helper, "enqueue_media_cleanup", fake_enqueue)
+
+    file = UploadFile(io.BytesIO(png(600, 600)), filename="me.png")
+    with pytest.raises(HTTPException) as excinfo:
+        await upload_profile_picture(file, "user1")
+
+    assert excinfo.value.status_code == 504
+    assert len(storage.uploaded) == 2
+    assert len(queued) == 1
+    assert sorted(queued[0][0]) == sorted(storage.uploaded)
+    assert queued[0][1] == "orphaned"
+
+
+async def test_successful_upload_queues_nothing(monkeypatch):
+    storage = FlakyStorage(failing_size=-1)
+    queued = []
+
+    async def fake_enqueue(public_ids, reason="replaced"):
+        queued.append(public_ids)
+
+    monkeypatch.setattr(cloudinary_helper, "get_media_storage", lambda: storage)
+    monkeypatch.setattr(cloudinary_helper, "enqueue_media_cleanup", fake_enqueue)
+
+    result = await upload_profile_picture(UploadFile(io.BytesIO(png(600, 600)), filename="me.png"), "user1")
+
+    assert queued == []
+    assert sorted(result["variants"]) == ["128", "500", "64"]
+    assert result["public_id"].endswith("_500")
@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.db.database import db
+from app.utils.rate_limit import MemoryBucketStore, MongoBucketStore, LoginThrottle
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+async def test_bucket_allows_burst_then_refills():
+    clock = FakeClock()
+    store = MemoryBucketStore(clock=clock)
+
+    assert [(await store.take("k", 2, 1.0))[0] for _ in range(3)] == [True, True, False]
+    allowed, retry_after = await store.take("k", 2, 1.0)
+    assert not allowed and retry_after == pytest.approx(1.0)
+
+    clock.now += 1.0
+    assert (await store.take("k", 2, 1.0))[0]
+
+
+async def test_full_store_evicts_refilled_buckets_before_active_ones():
+    clock = FakeClock()
+    store = MemoryBucketStore(max_keys=3, clock=clock)
+
+    # Slow bucket stays drained; fast bucket refills within a second
+    await store.take("slow", 1, 0.001)
+    await store.take("fast", 1, 10.0)
+    await store.take("other", 1, 0.001)
+    clock.now += 1.0
+
+    await store.take("new", 1, 1.0)
+
+    assert len(store) == 3
+    assert not (await store.take("slow", 1, 0.001))[0]
+
+
+async def test_key_spray_does_not_reset_recent_limits():
+    clock = FakeClock()
+    store = MemoryBucketStore(max_keys=10, clock=clock)
+
+    for _ in range(3):
+        await store.take("victim", 3, 0.001)
+    for i in range(9):
+        await store.take(f"spray:{i}", 3, 0.001)
+    # Touching the victim keeps it most recently used
+    assert not (await store.take("victim", 3, 0.001))[0]
+
+    for i in range(9, 15):
+        await store.take(f"spray:{i}", 3, 0.001)
+
+    assert len(store) == 10
+    assert not (await store.take("victim", 3, 0.001))[0]
+
+
+async def test_lru_bucket_evicted_when_nothing_has_refilled():
+    clock = FakeClock()
+    store = MemoryBucketStore(max_keys=2, clock=clock)
+
+    await store.take("a", 1, 0.001)
+    await store.take("b", 1, 0.001)
+    await store.take("c", 1, 0.001)
+
+    assert len(store) == 2
+    # "a" was evicted, so it starts from a full bucket again
+    assert (await store.take("a", 1, 0.001))[0]
+    assert not (await store.take("c", 1, 0.001))[0]
+
+
+async def test_email_bucket_is_scoped_to_client_ip(monkeypatch):
+    monkeypatch.setattr("app.utils.rate_limit.LOGIN_EMAIL_BURST", 2)
+    throttle = LoginThrottle(store=MemoryBucketStore(clock=FakeClock()))
+
+    await throttle.check("10.0.0.1", "victim@example.com")
+    await throttle.check("10.0.0.1", "Victim@example.com")
+    with pytest.raises(HTTPException) as exc:
+        await throttle.check("10.0.0.1", "victim@example.com")
+    assert exc.value.status_code == 429
+    assert int(exc.value.headers["Retry-After"]) >= 1
+
+    # The account owner on another network is unaffected
+    await throttle.check("192.168.1.5", "victim@example.com")
+    assert throttle.stats()["rejected_email"] == 1
+
+
+async def test_ip_bucket_limits_many_emails(monkeypatch):
+    monkeypatch.setattr("app.utils.rate_limit.LOGIN_IP_BURST", 3)
+    throttle = LoginThrottle(store=MemoryBucketStore(clock=FakeClock()))
+
+    for i in range(3):
+        await throttle.check("10.0.0.9", f"user{i}@example.com")
+    with pytest.raises(HTTPException):
+        await throttle.check("10.0.0.9", "user99@example.com")
+    assert throttle.stats()["rejected_ip"] == 1
+
+
+async def test_account_bucket_limits_attempts_from_many_ips(monkeypatch):
+    monkeypatch.setattr("app.utils.rate_limit.LOGIN_EMAIL_BURST", 2)
+    monkeypatch.setattr("app.utils.rate_limit.LOGIN_ACCOUNT_BURST", 5)
+    throttle = LoginThrottle(store=MemoryBucketStore(clock=FakeClock()))
+
+    # Each IP stays under its (email, IP) limit, but together they drain the account
+    for i in range(5):
+        await throttle.check(f"10.0.{i}.1", "Victim@example.com")
+    with pytest.raises(HTTPException) as exc:
+        await throttle.check("10.0.99.1", "victim@example.com")
+    assert exc.value.status_code == 429
+    assert throttle.stats()["rejected_account"] == 1
+
+    # Other accounts are unaffected
+    await throttle.check("10.0.99.1", "someone@example.com")
+
+
+async def test_store_errors_fail_open():
+    class BrokenStore:
+        async def take(self, key, capacity, per_second):
+            raise RuntimeError("store down")
+
+    throttle = LoginThrottle(store=BrokenStore())
+    await throttle.check("10.0.0.1", "user@example.com")
+    assert throttle.stats()["store_errors"] == 1
+
+
+@pytest.fixture
+async def mongo_store():
+    collection = db["login_throttle_test"]
+    await collection.delete_many({})
+    return MongoBucketStore(collection)
+
+
+async def test_mongo_store_allows_burst_then_rejects(mongo_store):
+    results = [await mongo_store.take("ip:10.0.0.1", 3, 0.01) for _ in range(4)]
+
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert results[-1][1] == pytest.approx(100, rel=0.01)
+
+    doc = await mongo_store.collection.find_one({"_id": "ip:10.0.0.1"})
+    assert doc["tokens"] == pytest.approx(0, abs=0.01)
+    # Idle buckets expire once they would have refilled completely
+    assert doc["expires_at"] - doc["updated_at"] == timedelta(seconds=300)
+
+
+async def test_mongo_store_refills_from_elapsed_time(mongo_store):
+    for _ in range(2):
+        await mongo_store.take("k", 2, 1.0)
+    assert not (await mongo_store.take("k", 2, 1.0))[0]
+
+    # Pretend the last attempt was 1.5 seconds ago: one whole token is back
+    await mongo_store.collection.update_one(
+        {"_id": "k"}, {"$set": {"updated_at": datetime.utcnow() - timedelta(seconds=1.5)}}
+    )
+    assert (await mongo_store.take("k", 2, 1.0))[0]
+    assert not (await mongo_store.take("k", 2, 1.0))[0]
+
+
+async def test_mongo_store_keys_are_independent(mongo_store):
+    await mongo_store.take("a", 1, 0.01)
+    assert not (await mongo_store.take("a", 1, 0.01))[0]
+    assert (await mongo_store.take("b", 1, 0.01))[0]
@@ -0,0 +1,107 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import transcription
+from app.utils import transcription_worker
+
+WAV = b"RIFF\x24\x00\x00\x00WAVEfmt " + b"\x00" * 64
+
+
+@pytest.fixture(scope="module")
+def client(fake_whisper_module, tmp_path_factory):
+    from app.main import create_app
+    from app.routes import transcribe
+
+    with pytest.MonkeyPatch.context() as patch:
+        # Workers in the app pick jobs up quickly; audio is spooled under tmp
+        patch.setattr(transcription_worker, "TRANSCRIPTION_POLL_INTERVAL", 0.05)
+        patch.setattr(transcribe, "TRANSCRIPTION_SPOOL_DIR", str(tmp_path_factory.mktemp("spool")))
+        with TestClient(create_app("auth,transcribe")) as client:
+            yield client
+
+
+@pytest.fixture(autouse=True)
+def empty_queue(client):
+    client.portal.call(transcription.COLLECTION.delete_many, {})
+
+
+def submit(client, headers, priority=None):
+    params = {"priority": priority} if priority else {}
+    return client.post("/api/v1/transcribe/jobs", params=params,
+                       files={"file": ("clip.wav", WAV, "audio/wav")}, headers=headers)
+
+
+def test_sync_transcription(client, whisper):
+    whisper.result = "hello"
+    response = client.post("/api/v1/transcribe", files={"file": ("clip.wav", WAV, "audio/wav")})
+    assert response.json() == {"text": "hello"}
+
+
+def test_submit_returns_202_with_location(client, whisper, new_user):
+    whisper.delay = 0.5
+    response = submit(client, new_user(client), "bulk")
+
+    assert response.status_code == 202
+    job = response.json()
+    assert response.headers["location"] == f"/api/v1/transcribe/jobs/{job['job_id']}"
+    assert job["status"] == "queued"
+    assert job["priority"] == "bulk"
+
+
+def test_submit_rejects_unknown_priority(client, whisper, new_user):
+    response = submit(client, new_user(client), "urgent")
+
+    assert response.status_code == 400
+    assert "realtime" in response.json()["detail"]
+    assert client.portal.call(transcription.COLLECTION.count_documents, {}) == 0
+
+
+def test_long_poll_wakes_when_the_job_finishes(client, whisper, new_user):
+    whisper.result = "spoken words"
+    whisper.delay = 0.3
+    headers = new_user(client)
+    location = submit(client, headers).headers["location"]
+
+    started = time.monotonic()
+    job = client.get(location, params={"wait": 10}, headers=headers).json()
+    elapsed = time.monotonic() - started
+
+    assert job["status"] == "done"
+    assert job["text"] == "spoken words"
+    # Woken by the worker, not by the once-a-second re-read or the deadline
+    assert elapsed < 0.9
+
+
+def test_poll_without_wait_returns_current_status(client, whisper, new_user):
+    whisper.delay = 0.5
+    headers = new_user(client)
+    location = submit(client, headers).headers["location"]
+
+    assert client.get(location, headers=headers).json()["status"] in ("queued", "running")
+
+
+def test_long_poll_returns_at_the_deadline(client, whisper, new_user):
+    whisper.delay = 2
+    headers = new_user(client)
+    location = submit(client, headers).headers["location"]
+
+    started = time.monotonic()
+    job = client.get(location, params={"wait": 0.3}, headers=headers).json()
+
+    assert job["status"] in ("queued", "running")
+    assert 0.3 <= time.monotonic() - started < 1.5
+
+
+def test_jobs_of_other_users_and_malformed_ids_are_not_found(client, whisper, new_user):
+    whisper.delay = 0.5
+    location = submit(client, new_user(client)).headers["location"]
+    other = new_user(client)
+
+    assert client.get(location, headers=other).status_code == 404
+    assert client.get("/api/v1/transcribe/jobs/not-an-id", headers=other).status_code == 404
+
+
+def test_submit_requires_auth(client, whisper):
+    assert submit(client, {}).status_code in (401, 403)
@@ -0,0 +1,144 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.models import transcription
+from app.models.transcription import claim_transcription_job, enqueue_transcription_job
+from app.utils import transcription_worker
+from app.utils.transcription_worker import process_job
+
+pytestmark = pytest.mark.anyio
+
+MAX_ATTEMPTS = 3
+LEASE = 600
+
+
+@pytest.fixture(autouse=True)
+def worker_settings(monkeypatch):
+    monkeypatch.setattr(transcription_worker, "TRANSCRIPTION_MAX_ATTEMPTS", MAX_ATTEMPTS)
+    monkeypatch.setattr(transcription_worker, "RETRY_DELAY_SECONDS", 0)
+
+
+@pytest.fixture
+async def audio(tmp_path):
+    await transcription.COLLECTION.delete_many({})
+    path = tmp_path / "clip.wav"
+    path.write_bytes(b"RIFF")
+    return path
+
+
+async def enqueue(path):
+    return await enqueue_transcription_job(str(ObjectId()), str(path))
+
+
+async def stored(job):
+    return await transcription.COLLECTION.find_one({"_id": job["_id"]})
+
+
+async def test_realtime_jobs_are_claimed_before_older_bulk_jobs(audio):
+    user_id = str(ObjectId())
+    bulk_old = await enqueue_transcription_job(user_id, str(audio), "bulk")
+    realtime_1 = await enqueue_transcription_job(user_id, str(audio), "realtime")
+    realtime_2 = await enqueue_transcription_job(user_id, str(audio), "realtime")
+    bulk_new = await enqueue_transcription_job(user_id, str(audio), "bulk")
+
+    order = [(await claim_transcription_job(LEASE))["_id"] for _ in range(4)]
+
+    assert order == [realtime_1["_id"], realtime_2["_id"], bulk_old["_id"], bulk_new["_id"]]
+    assert await claim_transcription_job(LEASE) is None
+
+
+async def test_completed_job_stores_text_and_removes_audio(whisper, audio):
+    job = await enqueue(audio)
+
+    await process_job(await claim_transcription_job(LEASE))
+
+    done = await stored(job)
+    assert done["status"] == "done"
+    assert done["text"] == "text of clip.wav"
+    assert "lease_id" not in done and done["expires_at"] > datetime.utcnow()
+    assert not audio.exists()
+
+
+async def test_failed_attempt_is_requeued_with_audio_kept(whisper, audio):
+    job = await enqueue(audio)
+    whisper.result = RuntimeError("decoder crashed")
+
+    await process_job(await claim_transcription_job(LEASE))
+
+    retried = await stored(job)
+    assert retried["status"] == "queued"
+    assert retried["attempts"] == 1
+    assert retried["last_error"] == "decoder crashed"
+    assert audio.exists()
+
+    # The next claim picks it up again and can succeed
+    whisper.result = None
+    await process_job(await claim_transcription_job(LEASE))
+    assert (await stored(job))["status"] == "done"
+    assert not audio.exists()
+
+
+async def test_job_gives_up_after_max_attempts(whisper, audio):
+    job = await enqueue(audio)
+    whisper.result = RuntimeError("bad audio")
+
+    for _ in range(MAX_ATTEMPTS):
+        await process_job(await claim_transcription_job(LEASE))
+
+    failed = await stored(job)
+    assert failed["status"] == "failed"
+    assert failed["attempts"] == MAX_ATTEMPTS
+    assert "expires_at" in failed
+    assert not audio.exists()
+    assert await claim_transcription_job(LEASE) is None
+
+
+async def test_expired_lease_is_reclaimed_and_stale_result_discarded(whisper, audio):
+    job = await enqueue(audio)
+    stale = await claim_transcription_job(0)  # lease expires immediately
+    current = await claim_transcription_job(LEASE)
+    assert current["_id"] == job["_id"]
+    assert current["lease_id"] != stale["lease_id"]
+    assert current["attempts"] == 2
+
+    await process_job(stale)
+
+    # The stale worker's result is dropped and the new holder keeps its audio
+    assert (await stored(job))["status"] == "running"
+    assert audio.exists()
+
+    await process_job(current)
+    assert (await stored(job))["status"] == "done"
+
+
+async def test_stale_failure_does_not_give_up_or_remove_audio(whisper, audio):
+    job = await enqueue(audio)
+    for _ in range(MAX_ATTEMPTS - 1):
+        await claim_transcription_job(0)
+    stale = await claim_transcription_job(0)
+    assert stale["attempts"] == MAX_ATTEMPTS
+    current = await claim_transcription_job(LEASE)
+
+    whisper.result = RuntimeError("timed out")
+    await process_job(stale)
+
+    still_running = await stored(job)
+    assert still_running["status"] == "running"
+    assert still_running["lease_id"] == current["lease_id"]
+    assert audio.exists()
+
+
+async def test_job_lost_too_many_times_is_failed_without_transcribing(whisper, audio):
+    job = await enqueue(audio)
+    for _ in range(MAX_ATTEMPTS):
+        await claim_transcription_job(0)
+
+    await process_job(await claim_transcription_job(LEASE))
+
+    failed = await stored(job)
+    assert failed["status"] == "failed"
+    assert failed["last_error"] == "Worker lost the job too many times"
+    assert whisper.calls == 0
+    assert not audio.exists()
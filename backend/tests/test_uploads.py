@@ -0,0 +1,114 @@
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app.utils.uploads import (
+    BodySizeLimitMiddleware,
+    read_upload,
+    sniff_audio_type,
+    sniff_image_type,
+    ALLOWED_AUDIO_TYPES,
+)
+
+UPLOAD_LIMIT = 4096
+DEFAULT_LIMIT = 512
+WAV_HEADER = b"RIFF\x24\x00\x00\x00WAVEfmt "
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        contents, detected = await read_upload(file, 10 * UPLOAD_LIMIT, sniff_audio_type, ALLOWED_AUDIO_TYPES)
+        return {"type": detected, "size": len(contents)}
+
+    @app.post("/upload/nested")
+    async def upload_nested(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    @app.post("/echo")
+    async def echo(payload: dict):
+        return {"keys": len(payload)}
+
+    app.add_middleware(BodySizeLimitMiddleware, limits={"/upload": UPLOAD_LIMIT}, default_limit=DEFAULT_LIMIT)
+    return TestClient(app)
+
+
+def wav(size: int) -> bytes:
+    return WAV_HEADER + b"\x00" * (size - len(WAV_HEADER))
+
+
+def chunked(data: bytes, chunk_size: int = 256):
+    # A generator body makes httpx send Transfer-Encoding: chunked (no Content-Length)
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+
+def multipart(data: bytes):
+    boundary = "testboundary"
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.wav\"\r\n"
+        f"Content-Type: audio/wav\r\n\r\n"
+    ).encode() + data + f"\r\n--{boundary}--\r\n".encode()
+    return body, {"content-type": f"multipart/form-data; boundary={boundary}"}
+
+
+def test_upload_within_limit(client):
+    response = client.post("/upload", files={"file": ("a.wav", wav(1024), "audio/wav")})
+    assert response.status_code == 200
+    assert response.json() == {"type": "wav", "size": 1024}
+
+
+def test_content_length_over_limit_is_rejected_upfront(client):
+    response = client.post("/upload", files={"file": ("a.wav", wav(2 * UPLOAD_LIMIT), "audio/wav")})
+    assert response.status_code == 413
+    assert response.headers["connection"] == "close"
+
+
+def test_chunked_body_over_limit_is_cut_off(client):
+    body, headers = multipart(wav(2 * UPLOAD_LIMIT))
+    response = client.post("/upload", content=chunked(body), headers=headers)
+    assert response.status_code == 413
+
+
+def test_chunked_body_within_limit_passes(client):
+    body, headers = multipart(wav(1024))
+    response = client.post("/upload", content=chunked(body), headers=headers)
+    assert response.status_code == 200
+    assert response.json()["size"] == 1024
+
+
+def test_limit_applies_to_trailing_slash_and_sub_paths(client):
+    big = wav(2 * UPLOAD_LIMIT)
+    assert client.post("/upload/", files={"file": ("a.wav", big, "audio/wav")}).status_code == 413
+    assert client.post("/upload/nested", files={"file": ("a.wav", big, "audio/wav")}).status_code == 413
+    ok = client.post("/upload/nested", files={"file": ("a.wav", wav(1024), "audio/wav")})
+    assert ok.status_code == 200
+
+
+def test_unlisted_routes_get_default_limit(client):
+    assert client.post("/echo", json={"a": 1}).status_code == 200
+    response = client.post("/echo", json={"a": "x" * (2 * DEFAULT_LIMIT)})
+    assert response.status_code == 413
+
+
+def test_prefix_does_not_match_sibling_paths():
+    middleware = BodySizeLimitMiddleware(None, {"/upload": UPLOAD_LIMIT, "/upload/big": 10 * UPLOAD_LIMIT}, default_limit=1)
+    assert middleware.limit_for("/upload/big/x") == 10 * UPLOAD_LIMIT
+    assert middleware.limit_for("/upload/other") == UPLOAD_LIMIT
+    assert middleware.limit_for("/uploads") == 1
+
+
+def test_read_upload_rejects_wrong_magic_bytes(client):
+    response = client.post("/upload", files={"file": ("a.wav", b"\x89PNG\r\n\x1a\n" + b"\x00" * 64, "audio/wav")})
+    assert response.status_code == 400
+
+
+def test_sniffers():
+    assert sniff_image_type(b"\xff\xd8\xff\xe0") == "jpeg"
+    assert sniff_image_type(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "webp"
+    assert sniff_audio_type(WAV_HEADER) == "wav"
+    assert sniff_audio_type(b"\x00\x00\x00\x18ftypM4A ") == "m4a"
+    assert sniff_audio_type(b"not audio") is None
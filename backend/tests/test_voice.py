@@ -0,0 +1,84 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+WAV = b"RIFF\x24\x00\x00\x00WAVEfmt " + b"\x00" * 64
+
+
+@pytest.fixture(scope="module")
+def client(fake_whisper_module):
+    from app.main import create_app
+    with TestClient(create_app("auth,chat,voice"), raise_server_exceptions=False) as client:
+        yield client
+
+
+def speak(client, headers, session_id=None):
+    data = {"session_id": session_id} if session_id else {}
+    return client.post("/api/v1/voice/message", files={"file": ("a.wav", WAV, "audio/wav")},
+                       data=data, headers=headers)
+
+
+def events(response):
+    parsed = []
+    for block in response.text.strip().split("\n\n"):
+        event, data = block.split("\n", 1)
+        parsed.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return parsed
+
+
+def test_voice_message_streams_and_stores_the_exchange(client, whisper, new_user):
+    whisper.result = "hello there"
+    headers = new_user(client)
+
+    response = speak(client, headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    stream = events(response)
+    kinds = [kind for kind, _ in stream]
+    assert kinds[0] == "transcript" and kinds[-1] == "done"
+    assert set(kinds[1:-1]) == {"reply"}
+
+    transcript, done = stream[0][1], stream[-1][1]
+    assert transcript["text"] == "hello there"
+    session_id = transcript["session_id"]
+    assert done["session_id"] == session_id
+    assert done["content"] == "".join(data["delta"] for kind, data in stream if kind == "reply").strip()
+
+    # Saved after the stream ended
+    session = client.get(f"/api/v1/sessions/{session_id}", headers=headers).json()
+    assert [(t["role"], t["content"]) for t in session["turns"]] == [
+        ("user", "hello there"), ("assistant", done["content"])
+    ]
+
+    follow_up = events(speak(client, headers, session_id))
+    assert follow_up[-1][0] == "done"
+    assert client.get(f"/api/v1/sessions/{session_id}", headers=headers).json()["turn_count"] == 4
+
+
+def test_unknown_or_foreign_session_is_rejected_before_transcribing(client, whisper, new_user):
+    owner = new_user(client)
+    session_id = events(speak(client, owner))[0][1]["session_id"]
+    whisper.calls = 0
+
+    other = new_user(client)
+    assert speak(client, other, session_id).status_code == 404
+    assert speak(client, owner, "not-an-object-id").status_code == 404
+    assert whisper.calls == 0
+
+
+def test_silence_reports_error_without_creating_a_session(client, whisper, new_user):
+    whisper.result = ""
+
+    stream = events(speak(client, new_user(client)))
+
+    assert stream == [
+        ("transcript", {"text": "", "session_id": None}),
+        ("error", {"detail": "No speech detected"})
+    ]
+
+
+def test_transcription_failure_is_a_server_error(client, whisper, new_user):
+    whisper.result = RuntimeError("decoder crashed")
+    assert speak(client, new_user(client)).status_code == 500